@@ -0,0 +1 @@
+from debox._version import __version__
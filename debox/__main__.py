@@ -0,0 +1,109 @@
+# debox/__main__.py
+"""
+Entry point for 'python3 -m debox' and the 'debox' executable.
+
+'debox run' is what desktop files and alias scripts call to launch
+applications, so the plain 'run NAME [-- ARGS...]' form is dispatched
+directly, without importing Typer/Click or building the command tree.
+Bash completion requests for container names and configuration keys are
+answered here as well. Everything else goes through the regular Typer
+application in debox.cli.
+"""
+
+import os
+import sys
+from typing import Optional
+
+# Installed system-wide (/usr/lib/debox) the package is byte-compiled by the
+# postinst script and its directory is read-only: don't try to write bytecode.
+if not os.access(os.path.dirname(os.path.abspath(__file__)), os.W_OK):
+    sys.dont_write_bytecode = True
+
+# Command paths whose first positional argument is a container name.
+_CONTAINER_NAME_COMMANDS = {
+    ("install",), ("remove",), ("reinstall",), ("repair",), ("run",),
+    ("configure",), ("apply",), ("upgrade",),
+    ("network", "allow"), ("network", "deny"),
+    ("image", "push"), ("image", "restore"),
+}
+
+# Options that consume the following word as their value.
+_VALUE_OPTIONS = {
+    "-c", "--config", "-k", "--key", "-s", "--set", "--add",
+    "-r", "--remove", "-m", "--map", "-u", "--unmap",
+}
+
+def _parse_run_args(args: list[str]) -> Optional[tuple[str, list[str]]]:
+    """
+    Returns (container_name, command_and_args) if args are exactly
+    'run NAME' or 'run NAME -- ...'. Returns None for anything else
+    (options, help, extra positionals), which Typer must handle.
+    """
+    if len(args) < 2 or args[0] != "run" or args[1].startswith("-"):
+        return None
+    rest = args[2:]
+    if not rest:
+        return args[1], []
+    if rest[0] == "--":
+        return args[1], rest[1:]
+    return None
+
+def _complete_bash() -> Optional[list[str]]:
+    """
+    Answers a bash completion request (Typer's COMP_WORDS/COMP_CWORD protocol)
+    for container names, '--key' and '--set' values.
+    Returns None for anything else, which Typer must handle.
+    """
+    import shlex
+    try:
+        words = shlex.split(os.environ.get("COMP_WORDS", ""))
+        cword = int(os.environ.get("COMP_CWORD", ""))
+    except ValueError:
+        return None
+    args = words[1:cword]
+    incomplete = words[cword] if cword < len(words) else ""
+    if incomplete.startswith("-"):
+        return None
+
+    positionals = []
+    expects_value = False
+    for arg in args:
+        if expects_value:
+            expects_value = False
+        elif arg in _VALUE_OPTIONS:
+            expects_value = True
+        elif not arg.startswith("-"):
+            positionals.append(arg)
+
+    from debox.core import autocompletion
+    if expects_value:
+        if positionals[:1] != ["configure"]:
+            return None
+        if args[-1] in ("-k", "--key"):
+            return autocompletion.complete_config_keys(incomplete)
+        if args[-1] in ("-s", "--set"):
+            return autocompletion.complete_boolean_values(incomplete)
+        return None
+
+    if tuple(positionals) in _CONTAINER_NAME_COMMANDS:
+        return autocompletion.complete_container_names(incomplete)
+    return None
+
+def main():
+    if os.environ.get("_DEBOX_COMPLETE") == "complete_bash":
+        completions = _complete_bash()
+        if completions is not None:
+            print("\n".join(completions))
+            return
+
+    run_args = _parse_run_args(sys.argv[1:])
+    if run_args is not None:
+        from debox.commands.run_cmd import run_app
+        run_app(*run_args)
+        return
+
+    from debox.cli import app
+    app(prog_name="debox")
+
+if __name__ == "__main__":
+    main()
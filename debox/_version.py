@@ -0,0 +1,3 @@
+# debox/_version.py
+# Kept in sync with debian/changelog by scripts/build_deb.sh. Must not import anything.
+__version__ = "0.5.5"
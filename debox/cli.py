@@ -1,35 +1,34 @@
-# debox/debox/cli.py
+# debox/cli.py
 
-from typing import Optional
+import functools
+import importlib
+import os
+import sys
+from typing import Annotated, Optional
 import typer
-from typing_extensions import Annotated
 from pathlib import Path
 
-from debox.commands import image_cmd
-from debox.core import autocompletion
 from debox.core.autocompletion import (
     complete_container_names, 
     complete_config_keys, 
-    complete_boolean_values,
-    LIST_KEYS, MAP_KEYS, BOOLEAN_KEYS
-)
-from debox.core.log_utils import LogLevels, log_error, set_log_level
-from .commands import (
-    install_cmd, 
-    remove_cmd, 
-    list_cmd, 
-    run_cmd, 
-    safe_prune_cmd, 
-    configure_cmd,
-    apply_cmd,
-    network_cmd,
-    reinstall_cmd,
-    upgrade_cmd,
-    repair_cmd,
-    system_cmd
+    complete_boolean_values
 )
+from debox.core.autocompletion_constants import LIST_KEYS, MAP_KEYS, BOOLEAN_KEYS
+
+def _version_callback(value: bool):
+    """Prints the version and exits before any command module is loaded."""
+    if value:
+        from debox._version import __version__
+        typer.echo(f"debox {__version__}")
+        raise typer.Exit()
 
 def main_callback(
+    version: Annotated[bool, typer.Option(
+        "--version",
+        help="Show the debox version and exit.",
+        callback=_version_callback,
+        is_eager=True
+    )] = False,
     verbose: Annotated[bool, typer.Option(
         "--verbose", "-v", 
         help="Enable verbose output with detailed technical logs."
@@ -42,6 +41,9 @@ def main_callback(
     """
     Debox: A container-based desktop application manager for Debian.
     """
+    # Imported here: log_utils loads Rich, which --version and completion never need.
+    from debox.core.log_utils import LogLevels, set_log_level
+
     if verbose:
         set_log_level(LogLevels.DEBUG)
     elif quiet:
@@ -55,11 +57,10 @@ app = typer.Typer(
     add_completion=True
 )
 
-@app.command()
 def install(
     container_name: Annotated[Optional[str], typer.Argument(
         help="The unique name for the new container (e.g., 'debox-firefox'). Optional if --config is used.",
-        autocompletion=autocompletion.complete_container_names,
+        autocompletion=complete_container_names,
         show_default=False
     )] = None,
     config_file: Annotated[Optional[Path], typer.Option(
@@ -69,7 +70,11 @@ def install(
         file_okay=True,
         dir_okay=False,
         readable=True
-    )] = None
+    )] = None,
+    no_cache: Annotated[bool, typer.Option(
+        "--no-cache",
+        help="Rebuild the image from scratch, without reusing cached build layers."
+    )] = False
 ):
     """
     Install a new application or re-run installation for an existing one.
@@ -77,16 +82,17 @@ def install(
     If the application is already installed, this command checks if the configuration matches.
     """
     if not container_name and not config_file:
+        from debox.core.log_utils import log_error
         log_error("You must provide a container name, a --config file, or both.")
         raise typer.Exit(code=1)
         
-    install_cmd.install_app(container_name, config_file)
+    from debox.commands import install_cmd
+    install_cmd.install_app(container_name, config_file, no_cache=no_cache)
 
-@app.command()
 def remove(
     container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to remove.",
-        autocompletion=autocompletion.complete_container_names
+        autocompletion=complete_container_names
     )],
     purge_home: Annotated[bool, typer.Option(
         "--purge", 
@@ -98,13 +104,13 @@ def remove(
     
     By default, preserves user data and configuration. Use --purge to delete everything.
     """
+    from debox.commands import remove_cmd
     remove_cmd.remove_app(container_name, purge_home)
 
-@app.command("reinstall")
 def reinstall(
      container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to reinstall.",
-        autocompletion=autocompletion.complete_container_names
+        autocompletion=complete_container_names
     )],
     config_file: Annotated[Optional[Path], typer.Option(
         "--config", "-c",
@@ -121,13 +127,13 @@ def reinstall(
     This removes the existing container and image, then installs it again using the 
     current (or provided) configuration. Preserves user data in the home directory.
     """
+    from debox.commands import reinstall_cmd
     reinstall_cmd.reinstall_app(container_name, config_file)
 
-@app.command("repair")
 def repair(
      container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to repair.",
-        autocompletion=autocompletion.complete_container_names
+        autocompletion=complete_container_names
     )]
 ):
     """
@@ -136,16 +142,16 @@ def repair(
     Recreates the container instance and re-applies desktop integration without 
     rebuilding the image. Useful for fixing broken shortcuts or permissions.
     """
+    from debox.commands import repair_cmd
     repair_cmd.repair_app(container_name)
 
-@app.command(name="list") 
 def list_apps():
     """
     List all installed applications and their status.
     """
+    from debox.commands import list_cmd
     list_cmd.list_installed_apps()
 
-@app.command()
 def run(
     container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to run.",
@@ -159,9 +165,9 @@ def run(
     """
     Launch an application inside its container.
     """
+    from debox.commands import run_cmd
     run_cmd.run_app(container_name, app_command_and_args if app_command_and_args else [])
 
-@app.command("safe-prune")
 def safe_prune(
     force: Annotated[bool, typer.Option("-f", "--force", help="Skip confirmation prompt.")] = False
 ):
@@ -171,9 +177,9 @@ def safe_prune(
     Removes dangling images, stopped containers, and networks, but preserves 
     resources managed by debox (labeled 'debox.managed=true').
     """
+    from debox.commands import safe_prune_cmd
     safe_prune_cmd.prune_resources(force)
 
-@app.command()
 def configure(
     container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to configure.",
@@ -211,40 +217,49 @@ def configure(
     
     Changes are staged and must be applied using 'debox apply'.
     """
-    actions = {
-        'set': set_value,
-        'add': add_value,
-        'remove': remove_value,
-        'set_map': map_value,
-        'unset_map': unmap_key,
-    }
-    
-    provided_actions = [(action, value) for action, value in actions.items() if value is not None]
+    from debox.core.log_utils import log_error
 
     if not key:
         log_error("Option '--key' / '-k' is required.", exit_program=True)
-        
-    if not provided_actions:
+
+    provided_count = (
+        (set_value is not None) + (add_value is not None) + (remove_value is not None)
+        + (map_value is not None) + (unmap_key is not None)
+    )
+    if provided_count == 0:
         log_error("You must provide an action: --set, --add, --remove, --map, or --unmap.", exit_program=True)
-        
-    if len(provided_actions) > 1:
-        log_error(f"Actions are mutually exclusive. You provided: {', '.join([a[0] for a in provided_actions])}", exit_program=True)
 
-    action_name, value = provided_actions[0]
+    if provided_count > 1:
+        provided_names = [
+            name for name, provided in (
+                ("set", set_value), ("add", add_value), ("remove", remove_value),
+                ("set_map", map_value), ("unset_map", unmap_key)
+            ) if provided is not None
+        ]
+        log_error(f"Actions are mutually exclusive. You provided: {', '.join(provided_names)}", exit_program=True)
+
+    if set_value is not None:
+        action_name, value = "set", set_value
+    elif add_value is not None:
+        action_name, value = "add", add_value
+    elif remove_value is not None:
+        action_name, value = "remove", remove_value
+    elif map_value is not None:
+        action_name, value = "set_map", map_value
+    else:
+        action_name, value = "unset_map", unmap_key
 
     # Basic validation
     if key in LIST_KEYS and action_name not in ("add", "remove"):
         log_error(f"Action '--{action_name}' is invalid for list key '{key}'. Use --add or --remove.", exit_program=True)
-    if key in MAP_KEYS and action_name not in ("set_map", "unset_map"):
+    elif key in MAP_KEYS and action_name not in ("set_map", "unset_map"):
         log_error(f"Action '--{action_name}' is invalid for map key '{key}'. Use --map or --unmap.", exit_program=True)
-    if key in BOOLEAN_KEYS and action_name != "set":
+    elif key in BOOLEAN_KEYS and action_name != "set":
         log_error(f"Action '--{action_name}' is invalid for boolean/simple key '{key}'. Use --set.", exit_program=True)
-    if action_name == "unmap": 
-        action_name = "unset_map"
     
+    from debox.commands import configure_cmd
     configure_cmd.configure_app(container_name, key, value, action_name)
     
-@app.command()
 def apply(
     container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to apply changes to.",
@@ -257,13 +272,13 @@ def apply(
     Detects changes made by 'debox configure' and rebuilds the image or recreates 
     the container as necessary.
     """
+    from debox.commands import apply_cmd
     apply_cmd.apply_changes(container_name)
 
-@app.command()
 def upgrade(
     container_name: Annotated[str, typer.Argument(
         help="The unique name of the container to upgrade.",
-        autocompletion=autocompletion.complete_container_names
+        autocompletion=complete_container_names
     )]
 ):
     """
@@ -272,134 +287,76 @@ def upgrade(
     Runs 'apt upgrade' inside the container, commits the changes, and pushes 
     the updated image to the registry. Does not change the configuration.
     """
+    from debox.commands import upgrade_cmd
     upgrade_cmd.upgrade_app(container_name)
 
 
-# --- Subcommand Groups ---
-
-network_app = typer.Typer(help="Manage container network connectivity.")
-app.add_typer(network_app, name="network")
-
-@network_app.command("allow")
-def network_allow(
-    container_name: Annotated[str, typer.Argument(
-        help="The unique name of the container.",
-        autocompletion=complete_container_names
-    )]
-):
-    """
-    Enable network access for an application (recreates container).
-    """
-    network_cmd.allow_network(container_name)
-
-@network_app.command("deny")
-def network_deny(
-    container_name: Annotated[str, typer.Argument(
-        help="The unique name of the container.",
-        autocompletion=complete_container_names
-    )]
-):
-    """
-    Disable network access for an application (recreates container).
-    """
-    network_cmd.deny_network(container_name)
-
-system_app = typer.Typer(help="Manage the debox system environment.")
-app.add_typer(system_app, name="system")
-
-@system_app.command("setup-registry")
-def setup_registry():
-    """
-    Initialize the local image registry.
-    
-    Creates the registry container, storage volume, and configures Podman to trust it.
-    Safe to run multiple times.
-    """
-    system_cmd.setup_registry()
-
-image_app = typer.Typer(help="Manage local images and the internal registry.")
-app.add_typer(image_app, name="image")
-
-@image_app.command("push")
-def image_push(
-    container_name: Annotated[str, typer.Argument(
-        help="The name of the container (e.g., 'debox-firefox') to backup.",
-        autocompletion=autocompletion.complete_container_names
-    )]
-):
-    """
-    Backup a local application image to the internal registry.
-    """
-    image_cmd.push_image(container_name)
-
-@image_app.command("list")
-def image_list():
-    """
-    List images stored in the internal registry.
-    """
-    image_cmd.list_images()
-
-@image_app.command("rm")
-def image_rm(
-    image_name: Annotated[str, typer.Argument(
-        help="The name of the image in the registry.",
-    )],
-    tag: Annotated[str, typer.Argument(
-        help="The tag to remove."
-    )] = "latest"
-):
-    """
-    Remove an image from the internal registry.
-    """
-    image_cmd.remove_image_from_registry(image_name, tag)
-
-@image_app.command("pull")
-def image_pull(
-    image_name: Annotated[str, typer.Argument(
-        help="The name of the image to pull (e.g. 'debox-firefox')."
-    )]
-):
-    """
-    Restore an image from the internal registry to the local Podman cache.
-    """
-    image_cmd.pull_image(image_name)
-
-@image_app.command("prune")
-def image_prune(
-    dry_run: Annotated[bool, typer.Option("--dry-run", help="Simulate the cleanup without deleting data.")] = False
-):
-    """
-    Clean up unused data in the internal registry.
-    """
-    image_cmd.prune_registry(dry_run)
-
-@image_app.command("restore")
-def image_restore(
-    container_name: Annotated[Optional[str], typer.Argument(
-        help="The specific container name to restore.",
-        autocompletion=autocompletion.complete_container_names
-    )] = None,
-    all_apps: Annotated[bool, typer.Option(
-        "--all", "-a",
-        help="Restore all configured applications."
-    )] = False
-):
-    """
-    Restore missing containers or images from the registry.
-    """
-    image_cmd.restore_images(container_name, all_apps)
-
-@image_app.command("build")
-def image_build(
-    config_file: Annotated[Path, typer.Argument(
-        help="Path to the base image configuration file.",
-        exists=True, file_okay=True, dir_okay=False, readable=True
-    )]
-):
-    """
-    Build a shared base image from a configuration file.
-    """
-    image_cmd.build_base_image(config_file)
+# --- Command Registration ---
+# Typer introspects the signature of every registered command when it builds
+# the Click tree, so only what the command line can reach is registered: the
+# invoked command or group, or everything for help, completion and unknown
+# words (so Click can report them properly).
+# Subcommand groups live in their own modules (debox/cli_<group>.py).
+
+COMMANDS = {
+    "install": install,
+    "remove": remove,
+    "reinstall": reinstall,
+    "repair": repair,
+    "list": list_apps,
+    "run": run,
+    "safe-prune": safe_prune,
+    "configure": configure,
+    "apply": apply,
+    "upgrade": upgrade,
+}
+
+SUBCOMMAND_GROUPS = ("network", "system", "image")
+
+def _sniff_subcommand() -> Optional[str]:
+    """
+    Returns the command word from sys.argv (the first non-option argument,
+    or '--version'), or None when everything is needed (no command, help or
+    shell completion).
+    """
+    if os.environ.get("_DEBOX_COMPLETE"):
+        return None
+    for arg in sys.argv[1:]:
+        if arg == "--help":
+            return None
+        if arg == "--version":
+            return arg
+        if not arg.startswith("-"):
+            return arg
+    return None
+
+@functools.cache
+def _add_subcommand_group(group: str):
+    """
+    Imports debox/cli_<group>.py and registers its Typer app.
+    Cached, so a group is built and added at most once per process.
+    """
+    module = importlib.import_module(f"debox.cli_{group}")
+    app.add_typer(getattr(module, f"{group}_app"), name=group)
+
+def _register_commands():
+    """Registers the commands and groups the current invocation may need."""
+    invoked = _sniff_subcommand()
+    if invoked == "--version":
+        return
+    if invoked in COMMANDS:
+        app.command(invoked)(COMMANDS[invoked])
+        return
+    if invoked in SUBCOMMAND_GROUPS:
+        _add_subcommand_group(invoked)
+        return
+
+    for name, command in COMMANDS.items():
+        app.command(name)(command)
+    for group in SUBCOMMAND_GROUPS:
+        _add_subcommand_group(group)
+
+_register_commands()
 
 if __name__ == "__main__":
     app(prog_name="debox")
@@ -0,0 +1,100 @@
+# debox/cli_image.py
+"""
+The 'image' subcommand group. Imported by debox.cli only when it can be invoked.
+"""
+
+from typing import Annotated, Optional
+import typer
+from pathlib import Path
+
+from debox.core.autocompletion import complete_container_names
+
+image_app = typer.Typer(help="Manage local images and the internal registry.")
+
+@image_app.command("push")
+def image_push(
+    container_name: Annotated[str, typer.Argument(
+        help="The name of the container (e.g., 'debox-firefox') to backup.",
+        autocompletion=complete_container_names
+    )]
+):
+    """
+    Backup a local application image to the internal registry.
+    """
+    from debox.commands import image_cmd
+    image_cmd.push_image(container_name)
+
+@image_app.command("list")
+def image_list():
+    """
+    List images stored in the internal registry.
+    """
+    from debox.commands import image_cmd
+    image_cmd.list_images()
+
+@image_app.command("rm")
+def image_rm(
+    image_name: Annotated[str, typer.Argument(
+        help="The name of the image in the registry.",
+    )],
+    tag: Annotated[str, typer.Argument(
+        help="The tag to remove."
+    )] = "latest"
+):
+    """
+    Remove an image from the internal registry.
+    """
+    from debox.commands import image_cmd
+    image_cmd.remove_image_from_registry(image_name, tag)
+
+@image_app.command("pull")
+def image_pull(
+    image_name: Annotated[str, typer.Argument(
+        help="The name of the image to pull (e.g. 'debox-firefox')."
+    )]
+):
+    """
+    Restore an image from the internal registry to the local Podman cache.
+    """
+    from debox.commands import image_cmd
+    image_cmd.pull_image(image_name)
+
+@image_app.command("prune")
+def image_prune(
+    dry_run: Annotated[bool, typer.Option("--dry-run", help="Simulate the cleanup without deleting data.")] = False
+):
+    """
+    Clean up unused data in the internal registry.
+    """
+    from debox.commands import image_cmd
+    image_cmd.prune_registry(dry_run)
+
+@image_app.command("restore")
+def image_restore(
+    container_name: Annotated[Optional[str], typer.Argument(
+        help="The specific container name to restore.",
+        autocompletion=complete_container_names
+    )] = None,
+    all_apps: Annotated[bool, typer.Option(
+        "--all", "-a",
+        help="Restore all configured applications."
+    )] = False
+):
+    """
+    Restore missing containers or images from the registry.
+    """
+    from debox.commands import image_cmd
+    image_cmd.restore_images(container_name, all_apps)
+
+@image_app.command("build")
+def image_build(
+    config_file: Annotated[Path, typer.Argument(
+        help="Path to the base image configuration file.",
+        exists=True, file_okay=True, dir_okay=False, readable=True
+    )]
+):
+    """
+    Build a shared base image from a configuration file.
+    """
+    from debox.commands import image_cmd
+    image_cmd.build_base_image(config_file)
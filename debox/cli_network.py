@@ -0,0 +1,37 @@
+# debox/cli_network.py
+"""
+The 'network' subcommand group. Imported by debox.cli only when it can be invoked.
+"""
+
+import typer
+from typing import Annotated
+
+from debox.core.autocompletion import complete_container_names
+
+network_app = typer.Typer(help="Manage container network connectivity.")
+
+# Shared by every command in this group (Typer copies the metadata per command).
+ContainerNameArg = Annotated[str, typer.Argument(
+    help="The unique name of the container.",
+    autocompletion=complete_container_names
+)]
+
+@network_app.command("allow")
+def network_allow(
+    container_name: ContainerNameArg
+):
+    """
+    Enable network access for an application (recreates container).
+    """
+    from debox.commands import network_cmd
+    network_cmd.allow_network(container_name)
+
+@network_app.command("deny")
+def network_deny(
+    container_name: ContainerNameArg
+):
+    """
+    Disable network access for an application (recreates container).
+    """
+    from debox.commands import network_cmd
+    network_cmd.deny_network(container_name)
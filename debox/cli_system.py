@@ -0,0 +1,19 @@
+# debox/cli_system.py
+"""
+The 'system' subcommand group. Imported by debox.cli only when it can be invoked.
+"""
+
+import typer
+
+system_app = typer.Typer(help="Manage the debox system environment.")
+
+@system_app.command("setup-registry")
+def setup_registry():
+    """
+    Initialize the local image registry.
+    
+    Creates the registry container, storage volume, and configures Podman to trust it.
+    Safe to run multiple times.
+    """
+    from debox.commands import system_cmd
+    system_cmd.setup_registry()
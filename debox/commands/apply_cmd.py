@@ -1,43 +1,81 @@
 # debox/commands/apply_cmd.py
 
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from debox.core import config_utils, gpg_utils, lifecycle, registry_utils
 from debox.core import hash_utils
 from debox.core import container_ops
 from debox.core import desktop_integration
-from debox.core.log_utils import log_debug, log_error, log_info, log_warning, run_step
+from debox.core.log_utils import LogLevels, ProgressReporter, log_debug, log_error, log_info, log_warning, run_step, temp_log_level
 
-def apply_changes(container_name: str):
+# Copied into the build context on every rebuild (the Containerfile sets its mode).
+_KEEP_ALIVE_SRC = Path(__file__).resolve().parent.parent / "core" / "keep_alive.py"
+
+def _remove_old_container(container_name: str, remove_image: bool):
+    """
+    Removes the container instance with its GPG context and, optionally,
+    its image afterwards (an image cannot be removed while a container uses it).
+    """
+    container_ops.remove_container_instance(container_name)
+    gpg_utils.remove_gpg_context(container_name)
+    if remove_image:
+        container_ops.remove_container_image(container_name)
+
+def apply_changes(container_name: str, silent: bool = False):
     """
     Applies pending configuration changes to an application.
     
     Detects changes by comparing configuration hashes and performs the necessary
     actions (rebuild image, recreate container, update desktop integration) efficiently.
+    With silent=True only warnings and errors are printed (no spinners), which is
+    how meta-commands like 'network' run it.
     """
+    if silent:
+        with temp_log_level(LogLevels.WARNING):
+            _apply_changes(container_name)
+    else:
+        # One spinner for every step, including the ones run by lifecycle hooks.
+        with ProgressReporter():
+            _apply_changes(container_name)
+
+def _apply_changes(container_name: str):
     log_debug(f"--- Applying configuration changes for: {container_name} ---")
 
     image_digest = None
     
     try:
         # 1. Load configurations
-        app_config_dir = config_utils.get_app_config_dir(container_name, create=False)
-        if not app_config_dir.is_dir():
-            log_error(f"Configuration directory for '{container_name}' not found.", exit_program=True)
-            
-        config_path = app_config_dir / "config.yml"
-        if not config_path.is_file():
-            log_error(f"config.yml not found for '{container_name}'.", exit_program=True)
-
-        # Load the CURRENT desired state from config.yml
-        current_config = config_utils.load_config(config_path)
+        try:
+            app_config_dir, config_path, config_stat = config_utils.stat_app_config(container_name)
+        except FileNotFoundError as e:
+            log_error(str(e), exit_program=True)
+
+        # Nothing flagged and config.yml untouched since the last apply: skip hashing.
+        config_mtime = config_stat.st_mtime_ns
+        if hash_utils.is_applied_state_current(app_config_dir, config_mtime):
+            log_debug("-> Configuration is already up to date (config.yml unchanged).")
+            log_info("\n✅ Apply complete. No changes needed.")
+            return
 
         # Load the LAST APPLIED state from .json file
         saved_hashes = hash_utils.get_last_applied_hashes(app_config_dir)
+
+        # Same bytes as the last applied config.yml: nothing to parse or compare.
+        content_hash = hash_utils.calculate_content_hash(config_path)
+        if content_hash == saved_hashes.get(hash_utils.STATE_KEY_CONTENT_HASH):
+            log_debug("-> Configuration is already up to date (config.yml content unchanged).")
+            hash_utils.save_last_applied_hashes(app_config_dir, saved_hashes, config_mtime)
+            hash_utils.remove_needs_apply_flag(app_config_dir)
+            log_info("\n✅ Apply complete. No changes needed.")
+            return
+
+        # Load the CURRENT desired state from config.yml
+        current_config = config_utils.load_config(config_path)
         
         # Calculate hashes for the CURRENT desired state
         current_hashes = hash_utils.calculate_hashes(current_config)
+        current_hashes[hash_utils.STATE_KEY_CONTENT_HASH] = content_hash
 
         # 2. Compare hashes and plan actions
         image_changed = (current_hashes['image'] != saved_hashes.get('image'))
@@ -54,6 +92,8 @@ def apply_changes(container_name: str):
 
         if not do_rebuild and not do_recreate and not do_reintegrate: # This implicitly covers 'no changes'
             log_debug("-> Configuration is already up to date.")
+            saved_hashes[hash_utils.STATE_KEY_CONTENT_HASH] = content_hash
+            hash_utils.save_last_applied_hashes(app_config_dir, saved_hashes, config_mtime)
             hash_utils.remove_needs_apply_flag(app_config_dir)
             log_info("\n✅ Apply complete. No changes needed.")
             return
@@ -62,8 +102,23 @@ def apply_changes(container_name: str):
         
         # 3. Execute actions in correct order
         
-        # 3a. Remove old desktop integration (must happen before container is destroyed)
-        if do_reintegrate:
+        # 3a-3c. Tear down the old state. Desktop integration lives on the host only,
+        # so it is removed concurrently with the container (and image) teardown.
+        if do_recreate:
+            teardown_target = "container instance and image" if do_rebuild else "container instance"
+            with run_step(
+                spinner_message=f"Removing old desktop integration and {teardown_target}...",
+                success_message=f"-> Desktop integration and {teardown_target} removed.",
+                error_message=f"Error removing old desktop integration or {teardown_target}"
+            ):
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    futures = [
+                        executor.submit(desktop_integration.remove_desktop_integration, container_name, current_config),
+                        executor.submit(_remove_old_container, container_name, do_rebuild),
+                    ]
+                    for future in futures:
+                        future.result()
+        elif do_reintegrate:
             with run_step(
                 spinner_message="Removing old desktop integration...",
                 success_message="-> Desktop integration removed.",
@@ -71,33 +126,13 @@ def apply_changes(container_name: str):
             ):
                 desktop_integration.remove_desktop_integration(container_name, current_config)
 
-        # 3b. Remove old container
-        if do_recreate:
-            with run_step(
-                spinner_message="Removing old container instance...",
-                success_message="-> Container instance removed.",
-                error_message="Error removing container instance"
-            ):
-                container_ops.remove_container_instance(container_name)
-                gpg_utils.remove_gpg_context(container_name)
-
         # 3c. Rebuild image (if needed)
         image_tag = f"localhost/{container_name}:latest" # Default tag
         if do_rebuild:
-            with run_step(
-                spinner_message="Removing old container image...",
-                success_message="-> Old container image removed.",
-                error_message="Error removing old image"
-            ):
-                container_ops.remove_container_image(container_name)
-            
             # Copy keep_alive script (this logic must be present, same as install)
             log_debug("-> Copying keep_alive.py to build context...")
             try:
-                current_dir = Path(__file__).parent
-                keep_alive_script_src = current_dir.parent / "core" / "keep_alive.py"
-                if keep_alive_script_src.is_file():
-                    shutil.copy(keep_alive_script_src, app_config_dir / "keep_alive.py")
+                container_ops.copy_file_if_changed(_KEEP_ALIVE_SRC, app_config_dir / "keep_alive.py")
             except Exception as e:
                  log_warning(f"Warning: Failed to copy keep_alive.py: {e}")
             
@@ -148,9 +183,7 @@ def apply_changes(container_name: str):
 
         current_hashes[hash_utils.STATE_KEY_REGISTRY_DIGEST] = image_digest
 
-        hash_utils.save_last_applied_hashes(app_config_dir, current_hashes)
-        hash_utils.set_installation_status(app_config_dir, hash_utils.STATUS_INSTALLED)
-        hash_utils.remove_needs_apply_flag(app_config_dir)
+        hash_utils.finalize_applied_state(app_config_dir, current_hashes, config_mtime)
 
         log_info("\n✅ Apply complete. Changes have been applied.")
 
@@ -1,5 +1,7 @@
 # debox/commands/configure_cmd.py
 
+import copy
+
 from debox.core import hash_utils
 from debox.core import config_utils
 from debox.core.log_utils import log_debug, log_error, log_info
@@ -15,15 +17,13 @@ def configure_app(container_name: str, key: str, value: str, action: str):
     
     try:
         # 1. Find and load the config
-        app_config_dir = config_utils.get_app_config_dir(container_name, create=False)
-        if not app_config_dir.is_dir():
-            log_error(f"Configuration directory for '{container_name}' not found.", exit_program=True)
-            
-        config_path = app_config_dir / "config.yml"
-        if not config_path.is_file():
-            log_error(f"config.yml not found for '{container_name}'.", exit_program=True)
-            
+        try:
+            app_config_dir, config_path, _ = config_utils.stat_app_config(container_name)
+        except FileNotFoundError as e:
+            log_error(str(e), exit_program=True)
+
         config = config_utils.load_config(config_path)
+        original_config = copy.deepcopy(config)
 
         # 2. Loop through and apply updates in memory
         log_debug(f"-> Applying change: {key}:{action}:{value}")
@@ -33,6 +33,11 @@ def configure_app(container_name: str, key: str, value: str, action: str):
         except (KeyError, TypeError, ValueError) as e:
             log_error(f"-> Applying update '{key}:{action}:{value}' failed: {e}", exit_program=True)
 
+        # Idempotent change (e.g. setting the current value): nothing to save or apply.
+        if config == original_config:
+            log_info(f"\n✅ Configuration for '{container_name}' already matches. No changes made.")
+            return
+
         # 3. Save the modified config file
         config_utils.save_config(config, config_path)
         
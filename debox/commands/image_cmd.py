@@ -4,17 +4,18 @@ Handles 'debox image ...' subcommands.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 import shutil
-import subprocess
 import tempfile
 import typer
-from typing_extensions import Annotated
 from rich.table import Table
-import yaml
 from debox.core import config_utils, container_ops, global_config, hash_utils, registry_utils, podman_utils
 from debox.core.log_utils import log_info, log_error, log_debug, console, log_warning, run_step
 
+# Upper bound for concurrent registry requests and podman calls.
+_MAX_WORKERS = 16
+
 def push_image(container_name: str):
     """
     Backs up the local image of an application to the internal registry.
@@ -62,6 +63,23 @@ def push_image(container_name: str):
 
     console.print(f"\n✅ Image for '{container_name}' is now backed up in the registry.", style="bold green")
 
+def _run_concurrently(func, items: list, status, progress_message: str) -> dict:
+    """
+    Calls func(item) for every item on a thread pool and returns {item: result}.
+    Meant for I/O-bound calls (registry HTTP requests, podman invocations),
+    whose round-trips then overlap. Updates the spinner as results come in.
+    """
+    results = {}
+    if not items:
+        return results
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(items))) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for done, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if status:
+                status.update(f"[bold green]{progress_message} ({done}/{len(items)})...")
+    return results
+
 def list_images():
     """
     Displays a status table of images in the internal registry.
@@ -79,32 +97,31 @@ def list_images():
             log_warning("No debox configuration directory found.")
             return
 
-        app_dirs_list = [d for d in config_utils.DEBOX_APPS_DIR.iterdir() if d.is_dir()]
+        app_configs = list(config_utils.iter_app_configs())
 
-        for i, app_dir in enumerate(app_dirs_list):
+        for i, (app_dir, config_path) in enumerate(app_configs):
             if status:
-                status.update(f"[bold green]Scanning config {i+1}/{len(app_dirs_list)}...")
+                status.update(f"[bold green]Scanning config {i+1}/{len(app_configs)}...")
             
-            config_path = app_dir / "config.yml"
-            if config_path.is_file():
-                try:
-                    with open(config_path, 'r') as f: config = yaml.safe_load(f)
-                    if not config or 'container_name' not in config: continue
-                    
-                    container_name = config['container_name']
-                    container_status = podman_utils.get_container_status(container_name)
-                    
-                    image_data_map[container_name] = {
-                        'app_name': config.get('app_name', 'N/A'),
-                        'base_image': config.get('image', {}).get('base', 'N/A'),
-                        'status': hash_utils.get_installation_status(app_dir),
-                        'container_status': container_status,
-                        'in_registry': False,
-                        'container_name': container_name,
-                        'tags': []
-                    }
-                except Exception as e:
-                    log_warning(f"Failed to parse config {config_path}: {e}")
+            try:
+                config = config_utils.load_config(config_path, required_keys=('container_name',))
+                
+                container_name = config['container_name']
+                image_data_map[container_name] = {
+                    'app_name': config.get('app_name', 'N/A'),
+                    'base_image': config.get('image', {}).get('base', 'N/A'),
+                    'status': hash_utils.get_installation_status(app_dir),
+                    'container_status': None,
+                    'in_registry': False,
+                    'container_name': container_name,
+                    'tags': []
+                }
+            except Exception as e:
+                log_warning(f"Failed to parse config {config_path}: {e}")
+
+        container_statuses = podman_utils.get_all_container_statuses(list(image_data_map))
+        for container_name, container_status in container_statuses.items():
+            image_data_map[container_name]['container_status'] = container_status
 
     image_names_in_registry = []
     try:
@@ -121,45 +138,47 @@ def list_images():
         log_info("-> No Debox applications configured or images found in registry.")
         return
 
-    with run_step(
-        spinner_message="Fetching tags for images...",
-        success_message="-> All tags retrieved.",
-        error_message="Failed to retrieve tags"
-    ) as status:
-        for i, name in enumerate(image_names_in_registry):
-            if status:
-                status.update(f"[bold green]Checking tags for {name} ({i+1}/{len(image_names_in_registry)})...")
-            
-            tags = registry_utils.get_image_tags(name)
-            
-            if not tags:
-                continue
-
-            if name in image_data_map:
-                image_data_map[name]['in_registry'] = True
-                image_data_map[name]['tags'] = tags
-            else:
-                image_data_map[name] = {
-                    'app_name': 'N/A (Orphaned Image)',
-                    'base_image': 'N/A',
-                    'status': 'N/A',
-                    'container_status': 'N/A',
-                    'in_registry': True,
-                    'tags': tags,
-                    'container_name': name
-                }
+    # An empty catalog needs no tag fetch (and no spinner); go straight to the table.
+    if image_names_in_registry:
+        with run_step(
+            spinner_message="Fetching tags for images...",
+            success_message="-> All tags retrieved.",
+            error_message="Failed to retrieve tags"
+        ) as status:
+            image_tags = _run_concurrently(
+                registry_utils.get_image_tags, image_names_in_registry, status, "Checking image tags"
+            )
+            for name in image_names_in_registry:
+                tags = image_tags[name]
+
+                if not tags:
+                    continue
+
+                entry = image_data_map.get(name)
+                if entry is not None:
+                    entry['in_registry'] = True
+                    entry['tags'] = tags
+                else:
+                    image_data_map[name] = {
+                        'app_name': 'N/A (Orphaned Image)',
+                        'base_image': 'N/A',
+                        'status': 'N/A',
+                        'container_status': 'N/A',
+                        'in_registry': True,
+                        'tags': tags,
+                        'container_name': name
+                    }
 
     def sort_key(item):
-        name = item.get('container_name', item.get('app_name', ''))
+        name = item.get('container_name') or item.get('app_name', '')
+        installed_rank = 1 if item['status'] == hash_utils.STATUS_INSTALLED else 2
         
         if not item['in_registry']:
-            if item['status'] == hash_utils.STATUS_INSTALLED: return (3, 1, name)
-            else: return (3, 2, name)
+            return (3, installed_rank, name)
         elif item['app_name'] == 'N/A (Orphaned Image)':
             return (2, 0, name)
         else:
-            if item['status'] == hash_utils.STATUS_INSTALLED: return (1, 1, name)
-            else: return (1, 2, name)
+            return (1, installed_rank, name)
             
     table_data = sorted(image_data_map.values(), key=sort_key)
 
@@ -171,27 +190,39 @@ def list_images():
     table.add_column("Base Image", style="green")
     table.add_column("App Installed?", style="yellow")
     
-    for item in table_data:
-        if item['in_registry'] and item.get('tags'):
-             tag = item['tags'][0]
-             image_str = f"{item['container_name']}:{tag}"
-        else:
-             image_str = "[dim]N/A[/dim]"
-        
-        status_str = "N/A"
-        if item['status'] == hash_utils.STATUS_INSTALLED: status_str = "[green]Yes[/green]"
-        elif item['status'] == hash_utils.STATUS_NOT_INSTALLED: status_str = "[dim]No[/dim]"
-        
-        table.add_row(
-            image_str,
+    status_labels = {
+        hash_utils.STATUS_INSTALLED: "[green]Yes[/green]",
+        hash_utils.STATUS_NOT_INSTALLED: "[dim]No[/dim]",
+    }
+    rows = [
+        (
+            f"{item['container_name']}:{item['tags'][0]}" if item['in_registry'] and item['tags'] else "[dim]N/A[/dim]",
             item['app_name'],
             item['container_name'],
             item['container_status'],
             item['base_image'],
-            status_str
+            status_labels.get(item['status'], "N/A"),
         )
+        for item in table_data
+    ]
+    add_row = table.add_row
+    for row in rows:
+        add_row(*row)
     console.print(table)
 
+def _delete_orphan_manifest(manifest: tuple) -> bool:
+    """
+    Deletes one (image_name, digest) manifest for prune_registry, which has
+    already made sure the registry is running.
+    Returns False on failure instead of exiting, so the other deletions go on.
+    """
+    image_name, digest = manifest
+    try:
+        return registry_utils.delete_image_manifest(image_name, digest, ensure_running=False)
+    except (Exception, SystemExit):
+        # delete_image_manifest has already reported the error.
+        return False
+
 def remove_image_from_registry(image_name: str, tag: str, ignore_errors: bool = False):
     """
     Permanently deletes an image from the internal registry.
@@ -279,6 +310,47 @@ def pull_image(image_name_input: str):
 
     console.print(f"\n✅ Image '{image_name}:{tag}' is now available in local Podman cache.", style="bold green")
 
+def _dir_size_bytes(root: Path) -> int:
+    """
+    Returns the disk usage of a directory tree (like 'du -s'), walked with
+    os.scandir in-process. Like du, hard-linked files are counted once.
+    Unreadable subdirectories are skipped with a warning.
+    """
+    root_stat = root.stat()
+    total = root_stat.st_blocks * 512
+    seen_inodes = {(root_stat.st_dev, root_stat.st_ino)}
+    pending = [root]
+    while pending:
+        path = pending.pop()
+        try:
+            entries = os.scandir(path)
+        except OSError as e:
+            if path == root:
+                raise
+            log_warning(f"Cannot read directory {path}, its size is not counted: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                entry_stat = entry.stat(follow_symlinks=False)
+                if entry_stat.st_nlink > 1:
+                    inode = (entry_stat.st_dev, entry_stat.st_ino)
+                    if inode in seen_inodes:
+                        continue
+                    seen_inodes.add(inode)
+                total += entry_stat.st_blocks * 512
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+    return total
+
+def _format_size(num_bytes: int) -> str:
+    """Formats a byte count the way 'du -h' does (e.g. '512K', '1.5G')."""
+    size = float(num_bytes)
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" or size >= 10 else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
 def prune_registry(dry_run: bool):
     """
     Cleans up unused data in the registry (Garbage Collection).
@@ -289,24 +361,15 @@ def prune_registry(dry_run: bool):
     if dry_run:
         console.print("[yellow]Running in DRY-RUN mode. No data will be deleted.[/yellow]")
 
-    active_images = set()
-    
-    if config_utils.DEBOX_APPS_DIR.is_dir():
-        for app_dir in config_utils.DEBOX_APPS_DIR.iterdir():
-            config_path = app_dir / "config.yml"
-            if config_path.is_file():
-                try:
-                    with open(config_path, 'r') as f:
-                        config = yaml.safe_load(f)
-                        if config and 'container_name' in config:
-                            active_images.add(config['container_name'])
-                except Exception: pass
-    
-    if config_utils.DEBOX_IMAGES_DIR.is_dir():
-        for img_dir in config_utils.DEBOX_IMAGES_DIR.iterdir():
-             # Nazwa katalogu to nazwa obrazu
-             active_images.add(img_dir.name)
-             
+    active_names = config_utils.get_active_container_names()
+    try:
+        with os.scandir(config_utils.DEBOX_IMAGES_DIR) as entries:
+            # The directory name is the image name
+            active_names |= {entry.name for entry in entries if entry.is_dir()}
+    except FileNotFoundError:
+        pass
+    active_images = frozenset(active_names)
+
     log_debug(f"Active images (from config): {active_images}")
 
     try:
@@ -316,6 +379,7 @@ def prune_registry(dry_run: bool):
         return
 
     orphans_found = False
+    orphan_manifests = []
 
     for image_name in registry_images:
         if image_name not in active_images:
@@ -328,14 +392,34 @@ def prune_registry(dry_run: bool):
             console.print(f"-> Found orphaned image: [magenta]{image_name}[/magenta] (Tags: {', '.join(tags)})")
             
             if not dry_run:
-                for tag in tags:
-                    remove_image_from_registry(image_name, tag, ignore_errors=True)
+                # Resolve every tag first: tags sharing a manifest need only one delete.
+                digests = {registry_utils.get_image_manifest_digest(image_name, tag) for tag in tags}
+                digests.discard(None)
+                if not digests:
+                    log_warning(f"Could not find digests for {image_name}. Skipping registry cleanup.")
+                orphan_manifests.extend((image_name, digest) for digest in sorted(digests))
             else:
                  console.print(f"   [dim](Dry run) Would remove {image_name}:{tags}[/dim]")
 
     if not orphans_found:
         log_info("-> No orphaned images found.")
 
+    if orphan_manifests:
+        # Once here, so the worker threads never try to start the registry concurrently.
+        registry_utils.ensure_registry_running()
+        with run_step(
+            spinner_message=f"Deleting {len(orphan_manifests)} orphaned manifest(s)...",
+            success_message="-> Orphaned manifests deleted.",
+            error_message="Failed to delete orphaned manifests",
+            fatal=False
+        ) as status:
+            results = _run_concurrently(
+                _delete_orphan_manifest, orphan_manifests, status, "Deleting orphaned manifests"
+            )
+            failed = sum(1 for deleted in results.values() if not deleted)
+            if failed:
+                log_warning(f"{failed} orphaned manifest(s) could not be deleted.")
+
     with run_step(
         spinner_message="Running Garbage Collector...",
         success_message="-> Garbage collection finished.",
@@ -346,11 +430,9 @@ def prune_registry(dry_run: bool):
     console.print("\n✅ Registry prune complete. Check logs above for details on freed space.", style="bold green")
     
     try:
-        registry_dir = global_config.STORAGE_DIR
-        result = subprocess.run(["du", "-sh", str(registry_dir)], capture_output=True, text=True)
-        if result.returncode == 0:
-             console.print(f"   Current registry size: [bold]{result.stdout.split()[0]}[/bold]")
-    except Exception:
+        registry_size = _dir_size_bytes(global_config.STORAGE_DIR)
+        console.print(f"   Current registry size: [bold]{_format_size(registry_size)}[/bold]")
+    except OSError:
         pass
 
 def restore_images(container_name: str = None, all_apps: bool = False):
@@ -364,8 +446,7 @@ def restore_images(container_name: str = None, all_apps: bool = False):
     configs_to_restore = []
 
     if container_name:
-        app_config_dir = config_utils.get_app_config_dir(container_name, create=False)
-        config_path = app_config_dir / "config.yml"
+        config_path = config_utils.get_app_config_path(container_name)
         if not config_path.is_file():
              console.print(f"❌ Error: Configuration not found for '{container_name}'.", style="bold red")
              return
@@ -377,13 +458,11 @@ def restore_images(container_name: str = None, all_apps: bool = False):
     
     elif all_apps:
         log_info("--- Scanning for applications to restore ---")
-        if config_utils.DEBOX_APPS_DIR.is_dir():
-            for app_dir in config_utils.DEBOX_APPS_DIR.iterdir():
-                if app_dir.is_dir() and (app_dir / "config.yml").is_file():
-                    try:
-                        configs_to_restore.append(config_utils.load_config(app_dir / "config.yml"))
-                    except Exception as e:
-                        log_warning(f"Skipping invalid config in {app_dir.name}: {e}")
+        for app_dir, config_path in config_utils.iter_app_configs():
+            try:
+                configs_to_restore.append(config_utils.load_config(config_path))
+            except Exception as e:
+                log_warning(f"Skipping invalid config in {app_dir.name}: {e}")
 
     restored_count = 0
     for config in configs_to_restore:
@@ -403,6 +482,17 @@ def restore_images(container_name: str = None, all_apps: bool = False):
     elif all_apps:
         console.print("\n-> No missing containers/images found.", style="dim")
 
+def _link_or_copy(src: Path, dst: Path):
+    """
+    Places a file into a temporary build context. The build only reads it, so
+    a hardlink is enough; falls back to a plain data copy (no metadata) when
+    linking is not possible (other filesystem, file owned by another user).
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
 def build_base_image(config_path: Path):
     """
     Builds a shared base image from a configuration file and pushes it to the registry.
@@ -415,12 +505,7 @@ def build_base_image(config_path: Path):
         log_error(f"Failed to initialize registry: {e}", exit_program=True)
 
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        
-        if 'image_name' not in config:
-            log_error("Config file must contain 'image_name' field.", exit_program=True)
-        
+        config = config_utils.load_config(config_path, required_keys=('image_name',))
         config['container_name'] = config['image_name']
         image_name = config['image_name']
         
@@ -435,16 +520,10 @@ def build_base_image(config_path: Path):
             current_dir = Path(__file__).parent
             keep_alive_script_src = current_dir.parent / "core" / "keep_alive.py"
             if keep_alive_script_src.is_file():
-                shutil.copy2(keep_alive_script_src, temp_context_dir / "keep_alive.py")
+                _link_or_copy(keep_alive_script_src, temp_context_dir / "keep_alive.py")
                 log_debug(f"-> Copied keep_alive.py to temp context.")
             
-            local_debs = config.get('image', {}).get('local_debs', [])
-            if local_debs:
-                for deb_path_str in local_debs:
-                    deb_path = Path(os.path.expanduser(deb_path_str))
-                    if not deb_path.is_file():
-                         raise FileNotFoundError(f"Local package not found: {deb_path}")
-                    shutil.copy2(deb_path, temp_context_dir / deb_path.name)
+            container_ops.copy_local_debs(config, temp_context_dir, copy_function=_link_or_copy)
 
             image_tag = f"localhost/{image_name}:latest"
             with run_step(
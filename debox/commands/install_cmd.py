@@ -1,8 +1,9 @@
 # debox/commands/install_cmd.py
 
+import filecmp
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import os
 from typing import Optional
 
 from debox.core import config_utils, gpg_utils, lifecycle, podman_utils, registry_utils
@@ -11,12 +12,18 @@ from debox.core import container_ops
 from debox.core import hash_utils
 from debox.core.log_utils import log_debug, run_step, console, log_info, log_error, log_warning
 
-def install_app(container_name: Optional[str], config_path: Optional[Path]):
+def _create_container(container_name: str, config: dict, image_tag: str):
+    """Prepares the GPG context and creates the container instance."""
+    gpg_utils.setup_gpg_context(container_name, config)
+    container_ops.create_container_instance(config, image_tag)
+
+def install_app(container_name: Optional[str], config_path: Optional[Path], no_cache: bool = False):
     """
     Orchestrates the installation process.
     
     Handles new installations from a config file and re-installations of existing
     applications. Manages image building, container creation, and desktop integration.
+    With no_cache, the image is rebuilt without reusing cached build layers.
     """
     log_debug(f"--- Starting install command ---")
     log_debug(f"Provided container_name: {container_name}")
@@ -42,7 +49,7 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
         log_error("No container name provided and no --config file specified.", exit_program=True)
 
     app_config_dir = config_utils.get_app_config_dir(final_container_name)
-    existing_config_path = app_config_dir / "config.yml"
+    existing_config_path = config_utils.get_app_config_path(final_container_name)
     installation_status = hash_utils.get_installation_status(app_config_dir)
     is_installed = (installation_status == hash_utils.STATUS_INSTALLED)
     existing_config_exists = existing_config_path.is_file()
@@ -52,11 +59,16 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
     if config_from_file:
         if is_installed:
             log_debug("-> App is installed. Comparing provided config with existing.")
-            config_from_existing = config_utils.load_config(existing_config_path)
-            current_hashes = hash_utils.calculate_hashes(config_from_file)
-            saved_hashes = hash_utils.calculate_hashes(config_from_existing)
+            # Byte-identical files need neither a parse of the existing config nor hashing.
+            if existing_config_exists and filecmp.cmp(config_path, existing_config_path, shallow=False):
+                identical = True
+            else:
+                config_from_existing = config_utils.load_config(existing_config_path)
+                current_hashes = hash_utils.calculate_hashes(config_from_file)
+                saved_hashes = hash_utils.calculate_hashes(config_from_existing)
+                identical = current_hashes == saved_hashes
             
-            if current_hashes == saved_hashes:
+            if identical:
                 log_info(f"Application '{final_container_name}' is already installed with an identical configuration.")
                 return
             else:
@@ -70,8 +82,10 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
                 log_info(f"-> New installation for '{final_container_name}'.")
             
             try:
-                shutil.copy2(config_path, existing_config_path)
+                # copyfile (not copy2): the installed config gets a fresh mtime, never an older file's signature
+                shutil.copyfile(config_path, existing_config_path)
                 log_debug(f"-> Copied new config to {existing_config_path}")
+                config_utils.write_config_cache(existing_config_path, config_from_file)
             except Exception as e:
                 log_error(f"Failed to copy config file: {e}", exit_program=True)
             
@@ -106,24 +120,15 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
             dest = app_config_dir / filename
             
             if src.is_file():
-                shutil.copy2(src, dest)
-                log_debug(f"-> Copied {filename} to build context.")
+                if container_ops.copy_file_if_changed(src, dest):
+                    log_debug(f"-> Copied {filename} to build context.")
             else:
                 if filename == "keep_alive.py":
                     log_error(f"{filename} not found! Container functionality will be broken.")
                 else:
                     log_warning(f"{filename} not found. Web opening might not work.")
         
-        local_debs = config.get('image', {}).get('local_debs', [])
-        if local_debs:
-            log_debug(f"-> Copying {len(local_debs)} local .deb package(s) to build context...")
-            for deb_path_str in local_debs:
-                deb_path = Path(os.path.expanduser(deb_path_str))
-                if not deb_path.is_file():
-                    raise FileNotFoundError(f"Local package not found: {deb_path}")
-                dest_path = app_config_dir / deb_path.name
-                shutil.copy2(deb_path, dest_path)
-                log_debug(f"--> Copied {deb_path.name}")
+        container_ops.copy_local_debs(config, app_config_dir)
             
         console.print("-> Configuration loaded and prepared.")
     except Exception as e:
@@ -140,7 +145,7 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
         pass
 
     with run_step(f"Building image 'localhost/{final_container_name}:latest'...", "-> Image built successfully.", "Error building image"):
-        image_tag = container_ops.build_container_image(config, app_config_dir)
+        image_tag = container_ops.build_container_image(config, app_config_dir, no_cache=no_cache)
     
     if old_image_id:
         try:
@@ -158,12 +163,20 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
     log_debug(f"-> Ensuring clean state for '{final_container_name}'...")
     container_ops.remove_container_instance(final_container_name)
     
-    with run_step(f"Creating container '{final_container_name}'...", "-> Container created successfully.", "Error creating container"):
-        gpg_utils.setup_gpg_context(final_container_name, config)
-        container_ops.create_container_instance(config, image_tag)
-    
-    with run_step("Applying desktop integration...", "-> Desktop integration applied.", "Error during desktop integration"):
-        desktop_integration.add_desktop_integration(config)
+    # The container has not run yet, so desktop integration reads the files
+    # from the image and runs concurrently with the container creation.
+    with run_step(
+        f"Creating container '{final_container_name}' and applying desktop integration...",
+        "-> Container created and desktop integration applied.",
+        "Error creating container or applying desktop integration"
+    ):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [
+                executor.submit(_create_container, final_container_name, config, image_tag),
+                executor.submit(desktop_integration.add_desktop_integration, config),
+            ]
+            for future in futures:
+                future.result()
         
     lifecycle.run_post_install_hooks(final_container_name, config)
 
@@ -178,11 +191,11 @@ def install_app(container_name: Optional[str], config_path: Optional[Path]):
     try:
         log_debug("-> Finalizing installation state...")
         current_hashes = hash_utils.calculate_hashes(config)
-        hash_utils.save_last_applied_hashes(app_config_dir, current_hashes)
         if image_digest:
-            hash_utils.save_image_digest(app_config_dir, image_digest)
-        hash_utils.set_installation_status(app_config_dir, hash_utils.STATUS_INSTALLED)
-        hash_utils.remove_needs_apply_flag(app_config_dir)
+            current_hashes[hash_utils.STATE_KEY_REGISTRY_DIGEST] = image_digest
+        current_hashes[hash_utils.STATE_KEY_CONTENT_HASH] = hash_utils.calculate_content_hash(existing_config_path)
+        config_mtime = existing_config_path.stat().st_mtime_ns
+        hash_utils.finalize_applied_state(app_config_dir, current_hashes, config_mtime)
         log_debug("-> Installation state finalized.")
     except Exception as e:
         log_warning(f"Could not finalize installation state: {e}")
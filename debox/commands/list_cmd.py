@@ -31,10 +31,7 @@ def list_installed_apps():
     log_debug("-> Pre-scanning for valid application configs...")
     app_dirs_list = []
     try:
-        app_dirs_list = [
-            app_dir for app_dir in config_utils.DEBOX_APPS_DIR.iterdir()
-            if app_dir.is_dir() and (app_dir / "config.yml").is_file()
-        ]
+        app_dirs_list = list(config_utils.iter_app_configs())
         total_apps = len(app_dirs_list)
         log_debug(f"-> Found {total_apps} application(s).")
     except Exception as e:
@@ -49,18 +46,29 @@ def list_installed_apps():
         success_message="",
         error_message="Error loading application list"
     ) as status:
+        # Load all configs first, so container statuses can be queried in one batch
+        configs = {}
+        for app_dir, config_path in app_dirs_list:
+            try:
+                configs[app_dir] = config_utils.load_config(config_path)
+            except Exception as e:
+                configs[app_dir] = e
+
+        container_statuses = podman_utils.get_all_container_statuses([
+            config.get('container_name', 'N/A') for config in configs.values() if isinstance(config, dict)
+        ])
+
         # Iterate through subdirectories in the apps config directory
-        for i, app_dir in enumerate(app_dirs_list):
-            config_path = app_dir / "config.yml"
+        for i, (app_dir, config_path) in enumerate(app_dirs_list):
             try:
-                # Load the app configuration
-                config = config_utils.load_config(config_path)
+                config = configs[app_dir]
+                if isinstance(config, Exception):
+                    raise config
                 app_name = config.get('app_name', 'N/A')
                 container_name = config.get('container_name', 'N/A')
                 base_image = config.get('image', {}).get('base', 'N/A')
 
-                # Get the container status using our utility function
-                container_status = podman_utils.get_container_status(container_name)
+                container_status = container_statuses[container_name]
 
                 # Add styling based on container status
                 status_style = "green"
@@ -21,8 +21,7 @@ def _set_network_permission(container_name: str, allow: bool):
 
     # 1. Check if the change is even needed
     try:
-        app_config_dir = config_utils.get_app_config_dir(container_name, create=False)
-        config_path = app_config_dir / "config.yml"
+        config_path = config_utils.get_app_config_path(container_name)
         if not config_path.is_file():
             log_error(f"Configuration file not found for '{container_name}'.", exit_program=True)
             
@@ -55,13 +54,12 @@ def _set_network_permission(container_name: str, allow: bool):
     # 3. Call the 'apply' command logic
     log_info("-> Applying changes (recreating container)...")
     log_debug(f"\n--- Step 2: Applying changes to '{container_name}' (this will recreate the container) ---")
-    with temp_log_level(LogLevels.WARNING):
-        try:
-            apply_cmd.apply_changes(container_name)
-        except SystemExit as e:
-            if e.code != 0: log_error(f"Apply step failed.", exit_program=True)
-        except Exception as e:
-            log_error(f"Apply step failed: {e}", exit_program=True)
+    try:
+        apply_cmd.apply_changes(container_name, silent=True)
+    except SystemExit as e:
+        if e.code != 0: log_error(f"Apply step failed.", exit_program=True)
+    except Exception as e:
+        log_error(f"Apply step failed: {e}", exit_program=True)
 
     log_info(f"\n✅ Network permission for '{container_name}' is now set to '{allow_str}' and applied.")
 
@@ -19,7 +19,7 @@ def reinstall_app(container_name: str, config_path: Optional[Path]):
     app_config_dir = config_utils.get_app_config_dir(container_name, create=False)
     installation_status = hash_utils.get_installation_status(app_config_dir)
     
-    if not config_path and not (app_config_dir / "config.yml").is_file():
+    if not config_path and not config_utils.get_app_config_path(container_name).is_file():
         log_error(f"Cannot reinstall '{container_name}': Configuration file not found.", exit_program=True)
         print("   If this is a new installation, use 'debox install --config ...'")
         return
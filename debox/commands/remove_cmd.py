@@ -1,8 +1,7 @@
-# debox/debox/commands/remove_cmd.py
+# debox/commands/remove_cmd.py
 
 import shutil
 
-from debox.commands import image_cmd
 from debox.core import container_ops, gpg_utils, hash_utils, podman_utils
 from debox.core import desktop_integration
 from debox.core import config_utils
@@ -35,7 +34,7 @@ def remove_app(container_name: str, purge_home: bool):
     
     config = {} 
     try:
-        config_path = app_config_dir / "config.yml"
+        config_path = config_utils.get_app_config_path(container_name)
         if config_path.is_file():
             config = config_utils.load_config(config_path) 
             log_debug(f"-> Found configuration for '{container_name}'")
@@ -78,6 +77,7 @@ def remove_app(container_name: str, purge_home: bool):
         tag = "latest" 
         
         try:
+            from debox.commands import image_cmd
             image_cmd.remove_image_from_registry(image_name, tag, ignore_errors=True)
         except Exception as e:
             log_warning(f"Failed to remove image from registry (ignore if already removed): {e}")
@@ -92,6 +92,7 @@ def remove_app(container_name: str, purge_home: bool):
                 shutil.rmtree(app_config_dir)
             else:
                 log_debug(f"-> Config directory not found, skipping: {app_config_dir}")
+            config_utils.remove_config_cache(config_utils.get_app_config_path(container_name))
         
         with run_step(
             spinner_message="Purging isolated home directory...",
@@ -107,7 +108,6 @@ def remove_app(container_name: str, purge_home: bool):
     else:
         try:
             log_debug("-> Updating installation status to NOT_INSTALLED.")
-            hash_utils.set_installation_status(app_config_dir, hash_utils.STATUS_NOT_INSTALLED)
             hash_utils.clear_config_hashes_keep_digest(app_config_dir)
             log_info("-> Configuration and isolated home directory kept (use --purge to remove everything).")
         except Exception as e:
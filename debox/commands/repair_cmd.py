@@ -19,7 +19,7 @@ def repair_app(container_name: str):
     
     try:
         app_config_dir = config_utils.get_app_config_dir(container_name, create=False)
-        config_path = app_config_dir / "config.yml"
+        config_path = config_utils.get_app_config_path(container_name)
         
         if not config_path.is_file():
             log_error(f"Configuration file for '{container_name}' not found. Cannot repair.", exit_program=True)
@@ -67,9 +67,11 @@ def repair_app(container_name: str):
 
         log_debug("-> Finalizing installation state...")
         current_hashes = hash_utils.calculate_hashes(config)
-        hash_utils.save_last_applied_hashes(app_config_dir, current_hashes)
-        hash_utils.set_installation_status(app_config_dir, hash_utils.STATUS_INSTALLED)
-        hash_utils.remove_needs_apply_flag(app_config_dir)
+        current_hashes[hash_utils.STATE_KEY_CONTENT_HASH] = hash_utils.calculate_content_hash(config_path)
+        image_digest = hash_utils.get_image_digest(app_config_dir)
+        if image_digest:
+            current_hashes[hash_utils.STATE_KEY_REGISTRY_DIGEST] = image_digest
+        hash_utils.finalize_applied_state(app_config_dir, current_hashes, config_path.stat().st_mtime_ns)
 
         log_info(f"\n✅ Repair of '{container_name}' complete!")
 
@@ -25,7 +25,7 @@ def run_app(container_name: str, app_command_and_args: list[str]):
         # --- 1. Load Config ---
         config = {}
         try:
-            config_path = config_utils.get_app_config_dir(container_name, create=False) / "config.yml"
+            config_path = config_utils.get_app_config_path(container_name)
             if not config_path.is_file():
                 log_error(f"Configuration file not found for '{container_name}'.", exit_program=True)
             config = config_utils.load_config(config_path)
@@ -13,7 +13,7 @@ from debox.core import global_config
 
 REGISTRY_IMAGE = "docker.io/library/registry:2"
 
-STORAGE_DIR = Path(os.path.expanduser("~/.local/share/debox/registry"))
+STORAGE_DIR = global_config.STORAGE_DIR
 CONF_DIR = Path(os.path.expanduser("~/.config/containers/registries.conf.d"))
 CONF_FILE = CONF_DIR / "99-debox.conf"
 REGISTRY_CONFIG_DIR = Path(os.path.expanduser("~/.config/debox/registry"))
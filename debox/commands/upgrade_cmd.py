@@ -23,25 +23,21 @@ def upgrade_app(container_name: str):
         ):
             podman_utils.run_command(["podman", "start", container_name])
         
-        # --- 2. Run apt update ---
+        # --- 2. Run apt update and upgrade ---
+        # Both run in one exec session, so the container lock and session
+        # bookkeeping are paid once.
         with run_step(
-            spinner_message="Running 'apt-get update' (as root)...",
-            success_message="-> Package lists refreshed.",
-            error_message="Failed to refresh package lists (apt-get update)"
+            spinner_message="Running 'apt-get update' and 'apt-get upgrade' (as root)... (This may take a while)",
+            success_message="-> Package lists refreshed and packages upgraded.",
+            error_message="Failed to upgrade packages (apt-get update && apt-get upgrade)"
         ):
-            cmd_update = ["podman", "exec", "--user", "root", container_name, "apt-get", "update", "-y"]
-            podman_utils.run_command(cmd_update)
-
-        # --- 3. Run apt upgrade ---
-        with run_step(
-            spinner_message="Running 'apt-get upgrade' (as root)... (This may take a while)",
-            success_message="-> Packages upgraded.",
-            error_message="Failed to upgrade packages (apt-get upgrade)"
-        ):
-            cmd_upgrade = ["podman", "exec", "--user", "root", container_name, "apt-get", "upgrade", "-y"]
+            cmd_upgrade = [
+                *podman_utils.exec_command_prefix(), "--user", "root", container_name,
+                "sh", "-c", "apt-get update -y && apt-get upgrade -y"
+            ]
             podman_utils.run_command(cmd_upgrade)
 
-        # --- 4. Commit the changes ---
+        # --- 3. Commit the changes ---
         with run_step(
             spinner_message=f"Committing changes to image: {image_tag}...",
             success_message="-> Changes committed to image.",
@@ -50,7 +46,7 @@ def upgrade_app(container_name: str):
             cmd_commit = ["podman", "commit", container_name, image_tag]
             podman_utils.run_command(cmd_commit)
 
-        # --- 5. Push image to debox registry ---
+        # --- 4. Push image to debox registry ---
         with run_step(
             spinner_message=f"Backing up upgraded image to local registry...",
             success_message="-> Upgraded image backed up.",
@@ -1,71 +1,34 @@
 # debox/core/autocompletion.py
 """
 Provides dynamic autocompletion functions for Typer.
+
+This module is imported on every CLI start (the functions are referenced in
+command signatures), so anything heavy is imported inside the function bodies.
 """
 
-import yaml
 from typing import List
 
-from debox.core import config_utils
+from debox.core.autocompletion_constants import (
+    VALID_CONFIG_KEYS, BOOLEAN_KEYS, LIST_KEYS, MAP_KEYS
+)
 
-def complete_container_names() -> List[str]:
+def complete_container_names(incomplete: str = "") -> List[str]:
     """
-    Returns a list of all installed container names
-    (e.g., 'debox-firefox', 'debox-vscode') for autocompletion.
+    Returns the installed container names (e.g., 'debox-firefox', 'debox-vscode')
+    starting with 'incomplete', for autocompletion.
     """
+    from debox.core import config_utils
+
     container_names = []
-    if not config_utils.DEBOX_APPS_DIR.is_dir():
-        return []  # Return an empty list if the directory doesn't exist
-    
-    for app_dir in config_utils.DEBOX_APPS_DIR.iterdir():
-        if app_dir.is_dir():
-            config_path = app_dir / "config.yml"
-            if config_path.is_file():
-                try:
-                    # Quickly load YAML to find only the 'container_name'
-                    with open(config_path, 'r') as f:
-                        config = yaml.safe_load(f)
-                        if config and 'container_name' in config:
-                            container_names.append(config['container_name'])
-                except Exception:
-                    continue  # Skip corrupted config files
+    for _, config_path in config_utils.iter_app_configs():
+        try:
+            name = config_utils.peek_container_name(config_path)
+        except Exception:
+            continue  # Skip missing or corrupted config files
+        if name and name.startswith(incomplete):
+            container_names.append(name)
     return container_names
 
-VALID_CONFIG_KEYS = [
-    "image.base", "image.debian_components", "image.apt_target_release",
-    "image.repositories", "image.packages",
-    "storage.volumes",
-    "runtime.default_exec", "runtime.prepend_exec_args",
-    "runtime.environment",
-    "integration.desktop_integration", "integration.skip_categories",
-    "integration.aliases",
-    "permissions.network", "permissions.bluetooth", "permissions.gpu",
-    "permissions.sound", "permissions.webcam", "permissions.microphone",
-    "permissions.printers", "permissions.system_dbus", "permissions.host_opener",
-    "permissions.devices",
-    "security.gpg_key_id",
-    "lifecycle.post_install",
-]
-
-BOOLEAN_KEYS = [
-    "integration.desktop_integration",
-    "permissions.network", "permissions.bluetooth", "permissions.gpu",
-    "permissions.sound", "permissions.webcam", "permissions.microphone",
-    "permissions.printers", "permissions.system_dbus", "permissions.host_opener",
-    "runtime.interactive",
-]
-
-LIST_KEYS = [
-    "image.debian_components", "image.repositories", "image.packages",
-    "storage.volumes", "runtime.prepend_exec_args",
-    "integration.skip_categories", "permissions.devices",
-]
-
-MAP_KEYS = [
-    "integration.aliases",
-    "runtime.environment",
-]
-    
 def complete_config_keys(incomplete: str) -> List[str]:
     """Suggests only keys (without ':')"""
     return [key for key in VALID_CONFIG_KEYS if key.startswith(incomplete)]
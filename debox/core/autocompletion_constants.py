@@ -0,0 +1,43 @@
+# debox/core/autocompletion_constants.py
+"""
+Configuration key tables shared by the CLI and the autocompletion helpers.
+
+This module must stay free of heavy imports: it is loaded on every CLI start.
+VALID_CONFIG_KEYS keeps its order for completion; the other tables are only
+used for membership tests and are frozensets.
+"""
+
+VALID_CONFIG_KEYS = [
+    "image.base", "image.debian_components", "image.apt_target_release",
+    "image.repositories", "image.packages",
+    "storage.volumes",
+    "runtime.default_exec", "runtime.prepend_exec_args",
+    "runtime.environment",
+    "integration.desktop_integration", "integration.skip_categories",
+    "integration.aliases",
+    "permissions.network", "permissions.bluetooth", "permissions.gpu",
+    "permissions.sound", "permissions.webcam", "permissions.microphone",
+    "permissions.printers", "permissions.system_dbus", "permissions.host_opener",
+    "permissions.devices",
+    "security.gpg_key_id",
+    "lifecycle.post_install",
+]
+
+BOOLEAN_KEYS = frozenset((
+    "integration.desktop_integration",
+    "permissions.network", "permissions.bluetooth", "permissions.gpu",
+    "permissions.sound", "permissions.webcam", "permissions.microphone",
+    "permissions.printers", "permissions.system_dbus", "permissions.host_opener",
+    "runtime.interactive",
+))
+
+LIST_KEYS = frozenset((
+    "image.debian_components", "image.repositories", "image.packages",
+    "storage.volumes", "runtime.prepend_exec_args",
+    "integration.skip_categories", "permissions.devices",
+))
+
+MAP_KEYS = frozenset((
+    "integration.aliases",
+    "runtime.environment",
+))
@@ -1,8 +1,14 @@
-# debox/core/config.py
+# debox/core/config_utils.py
 
+from collections import OrderedDict
 from pathlib import Path
+from typing import Iterator, Optional
+import copy
+import json
 import yaml
 import os
+import stat
+import threading
 
 from debox.core.log_utils import log_debug, log_error
 
@@ -13,13 +19,138 @@ DEBOX_IMAGES_DIR = Path(os.path.expanduser("~/.config/debox/images"))
 DEBOX_HOMES_DIR = Path(os.path.expanduser("~/.local/share/debox/homes"))
 DEBOX_SECURITY_DIR = Path(os.path.expanduser("~/.local/share/debox/security"))
 DESKTOP_FILES_DIR = Path(os.path.expanduser("~/.local/share/applications"))
+DEBOX_CACHE_DIR = Path(os.path.expanduser("~/.cache/debox"))
 
-def load_config(config_path: Path) -> dict:
+APP_CONFIG_FILE_NAME = "config.yml"
+
+# Prefer the libyaml-backed loader/dumper; fall back to the pure-Python ones.
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Parsed YAML files keyed by path, validated against (mtime, size, inode). LRU-bounded.
+# The lock guards the OrderedDict bookkeeping; commands may load configs from worker threads.
+_YAML_CACHE_MAX_ENTRIES = 100
+_yaml_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_yaml_cache_lock = threading.Lock()
+
+def _file_signature(path) -> tuple:
+    """Returns (mtime_ns, size, inode) of a file, used to tell whether it changed."""
+    file_stat = os.stat(path)
+    return (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+
+def read_yaml(path: Path):
+    """
+    Parses a YAML file, reusing the previous result while the file's
+    modification time, size and inode are unchanged (atomic rewrites
+    always get a new inode, even within the mtime granularity).
+
+    Returns a deep copy, so callers are free to mutate the result.
+    """
+    key = str(path)
+    signature = _file_signature(key)
+
+    with _yaml_cache_lock:
+        cached = _yaml_cache.get(key)
+        hit = cached is not None and cached[0] == signature
+        if hit:
+            _yaml_cache.move_to_end(key)
+            data = cached[1]
+
+    if not hit:
+        # Parsed outside the lock; a concurrent miss on the same file just parses it twice.
+        with open(key, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=_YamlLoader)
+        with _yaml_cache_lock:
+            _yaml_cache[key] = (signature, data)
+            _yaml_cache.move_to_end(key)
+            if len(_yaml_cache) > _YAML_CACHE_MAX_ENTRIES:
+                _yaml_cache.popitem(last=False)
+    return copy.deepcopy(data)
+
+def write_file_atomic(path: Path, content: str):
+    """
+    Writes text to a file through a temporary file and a rename,
+    so concurrent readers never observe a partially written file.
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+def _is_app_config(config_path: Path) -> bool:
+    """True for an installed app's config file (~/.config/debox/apps/<name>/config.yml)."""
+    return config_path.name == APP_CONFIG_FILE_NAME and config_path.parent.parent == DEBOX_APPS_DIR
+
+def _get_config_cache_path(config_path: Path) -> Path:
+    """Returns the JSON side-cache path for an app's config.yml."""
+    return DEBOX_CACHE_DIR / f"{config_path.parent.name}.json"
+
+def write_config_cache(config_path: Path, config: dict, signature: Optional[tuple] = None):
+    """
+    Stores a JSON copy of a parsed config.yml in ~/.cache/debox, so that
+    listing and shell completion can skip YAML parsing.
+    The copy is stored with the YAML file's (mtime, size, inode) signature
+    (as read before parsing, or taken now if not given); read_config_cached
+    only serves it while the file still has exactly that signature.
+    Configs that JSON cannot represent exactly (e.g. dates) are not cached.
+    Whenever no new cache is written, an existing one is deleted, so a stale
+    copy of a previous config can never be served.
+    """
+    cache_path = _get_config_cache_path(config_path)
+    try:
+        if signature is None:
+            signature = _file_signature(config_path)
+        content = json.dumps({"signature": list(signature), "config": config})
+        if json.loads(content)["config"] == config:
+            DEBOX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            write_file_atomic(cache_path, content)
+            return
+        log_debug(f"-> Config {config_path} does not round-trip through JSON. Not caching.")
+    except (TypeError, ValueError, OSError) as e:
+        log_debug(f"-> Could not write config cache {cache_path}: {e}")
+
+    try:
+        cache_path.unlink(missing_ok=True)
+    except OSError as e:
+        log_debug(f"-> Could not remove stale config cache {cache_path}: {e}")
+
+def remove_config_cache(config_path: Path):
+    """Deletes the JSON side-cache of an app's config.yml, if present."""
+    _get_config_cache_path(config_path).unlink(missing_ok=True)
+
+def read_config_cached(config_path: Path) -> dict:
+    """
+    Returns the parsed config.yml. Served from the JSON side-cache when it was
+    written for the YAML file's current (mtime, size, inode) signature;
+    otherwise the YAML is parsed and the cache refreshed.
+    """
+    cache_path = _get_config_cache_path(config_path)
+    signature = _file_signature(config_path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if tuple(cached["signature"]) == signature:
+            return cached["config"]
+    except (OSError, ValueError, TypeError, KeyError):
+        pass
+
+    config = read_yaml(config_path)
+    write_config_cache(config_path, config, signature)
+    return config
+
+def load_config(config_path: Path, required_keys: tuple = ('app_name', 'container_name', 'image')) -> dict:
     """
     Loads and validates an application's YAML configuration file.
 
     Args:
-        config_path: The path to the .yml file.
+        config_path: The path to the .yml file. Installed app configs are
+            read through the JSON side-cache (see read_config_cached), other
+            files through the parsed-YAML cache (see read_yaml).
+        required_keys: Top-level keys the file must define.
 
     Returns:
         A dictionary containing the parsed configuration.
@@ -31,11 +162,15 @@ def load_config(config_path: Path) -> dict:
     if not config_path.is_file():
         raise ValueError(f"Configuration file not found: {config_path}")
 
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    if _is_app_config(config_path):
+        config = read_config_cached(config_path)
+    else:
+        config = read_yaml(config_path)
+
+    if not isinstance(config, dict):
+        raise ValueError(f"Configuration file is empty or not a mapping: {config_path}")
 
     # Basic validation to ensure required keys are present.
-    required_keys = ['app_name', 'container_name', 'image']
     for key in required_keys:
         if key not in config:
             raise ValueError(f"Missing required key in config file: '{key}'")
@@ -43,6 +178,68 @@ def load_config(config_path: Path) -> dict:
     log_debug("-> Configuration loaded and validated successfully.")
     return config
 
+def get_app_config_path(container_name: str) -> Path:
+    """
+    Returns the path to the application's config.yml.
+    e.g., ~/.config/debox/apps/debox-vscode/config.yml
+    """
+    return DEBOX_APPS_DIR / container_name / APP_CONFIG_FILE_NAME
+
+def iter_app_configs() -> Iterator[tuple[Path, Path]]:
+    """
+    Yields (app_dir, config_path) for every application directory that holds
+    a config.yml. Uses os.scandir, so directory checks are answered from the
+    listing itself, and the existence check runs on the plain path string;
+    Path objects are built only for the entries that are yielded. Yields
+    nothing if DEBOX_APPS_DIR is missing.
+    """
+    try:
+        with os.scandir(DEBOX_APPS_DIR) as entries:
+            app_dirs = [entry.path for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
+        return
+    for app_dir in app_dirs:
+        config_path = os.path.join(app_dir, APP_CONFIG_FILE_NAME)
+        if os.path.isfile(config_path):
+            yield Path(app_dir), Path(config_path)
+
+def peek_container_name(config_path: Path) -> Optional[str]:
+    """
+    Returns the 'container_name' of a config, reading the file only up to its
+    top-level 'container_name:' line. Falls back to loading the whole
+    (cached) config if that line is missing or not a plain string value.
+    Returns None if the config has no string 'container_name'.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('container_name:'):
+                try:
+                    value = yaml.load(line, Loader=_YamlLoader).get('container_name')
+                except yaml.YAMLError:
+                    value = None
+                if isinstance(value, str):
+                    return value
+                break
+
+    config = read_config_cached(config_path)
+    name = config.get('container_name') if isinstance(config, dict) else None
+    return name if isinstance(name, str) else None
+
+def get_active_container_names() -> set[str]:
+    """
+    Returns the container names of all configured applications.
+    Unreadable or incomplete configs are skipped.
+    """
+    names = set()
+    for _, config_path in iter_app_configs():
+        try:
+            name = peek_container_name(config_path)
+        except Exception:
+            continue
+        if name:
+            names.add(name)
+    return names
+
 def get_app_config_dir(container_name: str, create: bool = True) -> Path:
     """
     Returns the path to the application's specific config directory.
@@ -53,6 +250,29 @@ def get_app_config_dir(container_name: str, create: bool = True) -> Path:
         app_dir.mkdir(parents=True, exist_ok=True)
     return app_dir
 
+def stat_app_config(container_name: str) -> tuple[Path, Path, os.stat_result]:
+    """
+    Locates an installed application's config.yml with a single stat() call.
+
+    Returns:
+        A tuple (app_config_dir, config_path, config_stat).
+
+    Raises:
+        FileNotFoundError: If the config directory or config.yml is missing.
+    """
+    app_config_dir = DEBOX_APPS_DIR / container_name
+    config_path = app_config_dir / APP_CONFIG_FILE_NAME
+    try:
+        config_stat = os.stat(config_path)
+    except (FileNotFoundError, NotADirectoryError):
+        # Only the error path pays for a second lookup to name the missing piece.
+        if not os.path.isdir(app_config_dir):
+            raise FileNotFoundError(f"Configuration directory for '{container_name}' not found.")
+        raise FileNotFoundError(f"config.yml not found for '{container_name}'.")
+    if not stat.S_ISREG(config_stat.st_mode):
+        raise FileNotFoundError(f"config.yml not found for '{container_name}'.")
+    return app_config_dir, config_path, config_stat
+
 def get_image_config_dir(image_name: str, create: bool = True) -> Path:
     """
     Returns the configuration directory for a base image (e.g. ~/.config/debox/images/debox-base).
@@ -74,27 +294,31 @@ def get_app_home_dir(container_name: str, create: bool = True) -> Path:
 
 def save_config(config: dict, config_path: Path):
     """
-    Saves a configuration dictionary back to a YAML file.
+    Saves a configuration dictionary back to a YAML file (atomically, so an
+    interrupted save never leaves a truncated config behind).
+    For installed app configs the JSON side-cache is refreshed as well.
     """
     try:
-        with open(config_path, 'w') as f:
-            yaml.dump(config, f, sort_keys=False, default_flow_style=False)
+        content = yaml.dump(config, Dumper=_YamlDumper, sort_keys=False, default_flow_style=False)
+        write_file_atomic(config_path, content)
         log_debug(f"-> Configuration saved to {config_path}")
+        if _is_app_config(config_path):
+            write_config_cache(config_path, config)
     except Exception as e:
         log_error(f"Saving configuration to {config_path} failed: {e}")
         raise
 
+_BOOLEAN_LITERALS = {'true': True, 'false': False}
+
+# Actions that create missing intermediate sections instead of failing.
+_PATH_CREATING_ACTIONS = frozenset(('set', 'add', 'set_map'))
+
 def _convert_type(value_str: str):
     """
     Naively converts "true"/"false" strings to booleans.
     """
-    val_lower = value_str.lower()
-    if val_lower == 'true':
-        return True
-    if val_lower == 'false':
-        return False
     # Could add int/float conversion, but string is safest for now
-    return value_str
+    return _BOOLEAN_LITERALS.get(value_str.lower(), value_str)
 
 def update_config_value(config: dict, path_str: str, action: str, value_str: str):
     """
@@ -104,11 +328,12 @@ def update_config_value(config: dict, path_str: str, action: str, value_str: str
     """
     keys = path_str.split('.')
     parent = config
+    creates_path = action in _PATH_CREATING_ACTIONS
     
     # Traverse/create path up to the *parent* of the final key
     for key in keys[:-1]:
         # If we are setting a value, create dictionaries if they don't exist
-        if action in ('set', 'add', 'set_map'):
+        if creates_path:
             # setdefault is perfect: it gets the key, or creates it if not found
             parent = parent.setdefault(key, {}) 
             if not isinstance(parent, dict):
@@ -167,12 +392,12 @@ def update_config_value(config: dict, path_str: str, action: str, value_str: str
         target_map = parent.setdefault(final_key, {}) # Get map or create new empty map
         if not isinstance(target_map, dict):
              raise TypeError(f"Cannot 'set_map' on non-dict key: {path_str}")
-        try:
-            k, v = value_str.split('=', 1)
-        except ValueError:
+        k, sep, v = value_str.partition('=')
+        if not sep:
             raise ValueError("Invalid map format. Expected 'key=value'.")
-        target_map[k.strip()] = v.strip() # Store value as string
-        log_debug(f"  - Set Map: {path_str}.{k.strip()} = {v.strip()}")
+        k, v = k.strip(), v.strip()
+        target_map[k] = v # Store value as string
+        log_debug(f"  - Set Map: {path_str}.{k} = {v}")
             
     elif action == 'unset_map':
         # Remove a key from an *existing* dictionary
@@ -5,16 +5,120 @@ Handles core Podman operations: building images, creating containers,
 and removing containers and images for debox.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import functools
 import os
 import locale
 import getpass
+import shutil
 
-from debox.core import gpg_utils, registry_utils
+from debox.core import gpg_utils, hash_utils, registry_utils
 from debox.core.log_utils import log_debug, log_error, log_warning
 from . import podman_utils
 from . import config_utils
 
+# Cache mounts for the apt archives and package lists (kept by podman between builds).
+_APT_CACHE_MOUNTS = (
+    "--mount=type=cache,target=/var/cache/apt,sharing=locked "
+    "--mount=type=cache,target=/var/lib/apt/lists,sharing=locked"
+)
+# Stop apt (and Debian's docker-clean hook) from deleting the downloaded packages
+# for the duration of the apt RUN only.
+_APT_CACHE_SETUP_CMDS = (
+    "if [ -f /etc/apt/apt.conf.d/docker-clean ]; then mv /etc/apt/apt.conf.d/docker-clean /etc/apt/apt.conf.d/docker-clean.debox; fi",
+    "echo 'Binary::apt::APT::Keep-Downloaded-Packages \"true\";' > /etc/apt/apt.conf.d/99debox-keep-cache",
+)
+# Restore apt's default clean-up at the end of that RUN, so apt use inside the
+# container (e.g. 'debox upgrade') does not leave .debs in committed images.
+_APT_CACHE_TEARDOWN_CMDS = (
+    "rm -f /etc/apt/apt.conf.d/99debox-keep-cache",
+    "if [ -f /etc/apt/apt.conf.d/docker-clean.debox ]; then mv /etc/apt/apt.conf.d/docker-clean.debox /etc/apt/apt.conf.d/docker-clean; fi",
+)
+
+# Session variables handed to desktop-integrated containers as bare '-e VAR' flags.
+# Only variables that are set (and non-empty) on the host are passed, so an
+# empty WAYLAND_DISPLAY or DISPLAY never steers the toolkit's backend choice.
+_SESSION_ENV_VARS = ("DISPLAY", "WAYLAND_DISPLAY", "XDG_RUNTIME_DIR",
+                     "DBUS_SESSION_BUS_ADDRESS", "PULSE_SERVER", "XDG_SESSION_TYPE")
+
+# Fixed Containerfile setup steps. HOST_USER/HOST_UID are build ARGs, so
+# these commands never change between builds.
+_HOST_OPENER_SETUP_CMDS = (
+    "chmod +x /usr/local/bin/debox-open",
+    "mkdir -p /etc/xdg",
+    "echo '[Default Applications]' > /etc/xdg/mimeapps.list",
+    "echo 'text/html=debox-open.desktop' >> /etc/xdg/mimeapps.list",
+    "echo 'x-scheme-handler/http=debox-open.desktop' >> /etc/xdg/mimeapps.list",
+    "echo 'x-scheme-handler/https=debox-open.desktop' >> /etc/xdg/mimeapps.list",
+)
+_NEW_USER_SETUP_CMDS = (
+    "useradd -m -s /bin/bash -u $HOST_UID -G video,audio,plugdev $HOST_USER",
+    "usermod -aG sudo $HOST_USER",
+    'echo "$HOST_USER ALL=(ALL) NOPASSWD:ALL" >> /etc/sudoers',
+)
+_EXISTING_USER_SETUP_CMDS = (
+    "usermod -aG video,audio,plugdev $HOST_USER",
+)
+
+def copy_file_if_changed(src: Path, dest: Path) -> bool:
+    """
+    Copies src to dest (with metadata, see shutil.copy2) unless dest already
+    has the same size and modification time, i.e. is an earlier copy of the
+    same file. Returns True if the file was copied.
+    """
+    src_stat = os.stat(src)
+    try:
+        dest_stat = os.stat(dest)
+        if dest_stat.st_size == src_stat.st_size and dest_stat.st_mtime_ns == src_stat.st_mtime_ns:
+            log_debug(f"-> {dest} is up to date. Not copying.")
+            return False
+    except FileNotFoundError:
+        pass
+    shutil.copy2(src, dest)
+    return True
+
+def copy_local_debs(config: dict, context_dir: Path, copy_function=copy_file_if_changed):
+    """
+    Copies the packages listed in image.local_debs into a build context.
+    All paths are checked first, so a missing package fails before any copy
+    starts; the copies themselves run concurrently (packages can be large).
+    By default, packages already copied by an earlier build are not copied again.
+    """
+    jobs = []
+    for deb_path_str in config.get('image', {}).get('local_debs', []):
+        deb_path = Path(os.path.expanduser(deb_path_str))
+        if not deb_path.is_file():
+            raise FileNotFoundError(f"Local package not found: {deb_path}")
+        jobs.append((deb_path, context_dir / deb_path.name))
+
+    if not jobs:
+        return
+    log_debug(f"-> Copying {len(jobs)} local .deb package(s) to build context...")
+    with ThreadPoolExecutor(max_workers=min(4, len(jobs))) as executor:
+        for _ in executor.map(lambda job: copy_function(*job), jobs):
+            pass
+
+def _repository_cmds(repo: dict, default_list_filename: str) -> list[str]:
+    """
+    Returns the shell commands that add one 'image.repositories' entry:
+    its signing key (if key_url and key_path are given) and its sources file.
+    """
+    repo_string = repo['repo_string']
+    key_url = repo.get('key_url')
+    key_path = repo.get('key_path')
+    list_filename = repo.get('list_filename') or default_list_filename
+
+    cmds = []
+    if key_url and key_path:
+        log_debug(f"-> Adding keyed repository: {repo_string}")
+        cmds.append(f"mkdir -p $(dirname {key_path})")
+        cmds.append(f"wget -qO- {key_url} | gpg --dearmor > {key_path}")
+    else:
+        log_debug(f"-> Adding keyless repository: {repo_string}")
+    cmds.append(f"echo \"{repo_string}\" > /etc/apt/sources.list.d/{list_filename}")
+    return cmds
+
 def _generate_containerfile(config: dict, host_user: str, host_uid: int, host_locale: str) -> str:
     """
     Generates the content of the Containerfile based on the YAML config.
@@ -24,11 +128,10 @@ def _generate_containerfile(config: dict, host_user: str, host_uid: int, host_lo
     
     is_debox_base = base_image.startswith("localhost/") or base_image.startswith("localhost:5000/")
 
-    lines = [f"FROM {base_image}"]
-    lines.append(f"ARG HOST_USER={host_user}")
-    lines.append(f"ARG HOST_UID={host_uid}")
-    lines.append(f"ARG HOST_LOCALE={host_locale}")
-    lines.append("ENV DEBIAN_FRONTEND=noninteractive")
+    lines = [
+        f"FROM {base_image}",
+        "ENV DEBIAN_FRONTEND=noninteractive",
+    ]
 
     image_cfg = config.get('image', {})
     integration_cfg = config.get('integration', {})
@@ -37,53 +140,34 @@ def _generate_containerfile(config: dict, host_user: str, host_uid: int, host_lo
     permissions = config.get('permissions', {})
     host_opener_enabled = permissions.get('host_opener', False)
 
+    # All apt work (components, pre-dependencies, repositories and
+    # packages) runs in a single RUN, so the package lists are fetched at most
+    # twice per build and the image gets one layer instead of one per step.
+    # The apt archive and list directories are cache mounts that persist
+    # across builds, so rebuilds do not download the same .debs again.
+    apt_cmds = list(_APT_CACHE_SETUP_CMDS)
+    env_lines = []
     if not is_debox_base:
         components = image_cfg.get('debian_components', [])
         if components:
             components_str = " ".join(components)
             log_debug(f"-> Enabling Debian components: {components_str}")
-            lines.append(
-                f"RUN sed -i -e 's/ main/ main {components_str}/g' /etc/apt/sources.list.d/debian.sources"
-            )
+            apt_cmds.append(f"sed -i -e 's/ main/ main {components_str}/g' /etc/apt/sources.list.d/debian.sources")
         else:
             log_debug("-> No additional Debian components requested.")
 
-        lines.append("RUN apt-get update && apt-get install -y wget gpg sudo locales python3 && apt-get clean")
-
-        # Locale generation
-        lines.append(f"RUN echo '{host_locale} UTF-8' >> /etc/locale.gen")
-        lines.append("RUN locale-gen")
-        lines.append(f"ENV LANG={host_locale}")
-        lines.append(f"ENV LC_ALL={host_locale}")
-    else:
-        pass
+        apt_cmds.append("apt-get update")
+        apt_cmds.append("apt-get install -y wget gpg sudo locales python3")
 
     # Handle repositories
-    repo_list = image_cfg.get('repositories', [])
-    if repo_list:
-        repo_counter = 0
-        for repo in repo_list:
-            repo_string = repo.get('repo_string')
-            if not repo_string:
-                print(f"Warning: Skipping repository entry with no 'repo_string'.")
-                continue
-
-            key_url = repo.get('key_url')
-            key_path = repo.get('key_path')
-            
-            if key_url and key_path:
-                log_debug(f"-> Adding keyed repository: {repo_string}")
-                lines.append(f"RUN mkdir -p $(dirname {key_path})")
-                lines.append(f"RUN wget -qO- {key_url} | gpg --dearmor > {key_path}")
-            else:
-                log_debug(f"-> Adding keyless repository: {repo_string}")
-            
-            list_filename = repo.get('list_filename')
-            if not list_filename:
-                list_filename = f"{config['container_name']}-repo-{repo_counter}.sources"
-
-            lines.append(f"RUN echo \"{repo_string}\" > /etc/apt/sources.list.d/{list_filename}")
-            repo_counter += 1
+    repo_counter = 0
+    for repo in image_cfg.get('repositories') or []: # A bare 'repositories:' key is None
+        if not repo.get('repo_string'):
+            print(f"Warning: Skipping repository entry with no 'repo_string'.")
+            continue
+        default_list_filename = f"{config['container_name']}-repo-{repo_counter}.sources"
+        apt_cmds.extend(_repository_cmds(repo, default_list_filename))
+        repo_counter += 1
 
     # Handle package installation
     packages_to_install = image_cfg.get('packages', [])
@@ -99,7 +183,6 @@ def _generate_containerfile(config: dict, host_user: str, host_uid: int, host_lo
     local_debs_config = image_cfg.get('local_debs', [])
     if local_debs_config:
         lines.append("\n# Copy local .deb packages")
-        lines.append("RUN mkdir -p /tmp/debox_debs") 
         for deb_path_str in local_debs_config:
             deb_filename = Path(os.path.expanduser(deb_path_str)).name
             container_deb_path = f"/tmp/debox_debs/{deb_filename}"
@@ -116,38 +199,46 @@ def _generate_containerfile(config: dict, host_user: str, host_uid: int, host_lo
         if target_release:
             log_debug(f"-> Setting APT target release to: {target_release}")
             install_cmd += f" -t {target_release}"
-            lines.append(f"RUN echo 'APT::Default-Release \"{target_release}\";' > /etc/apt/apt.conf.d/99debox-target")
+            apt_cmds.append(f"echo 'APT::Default-Release \"{target_release}\";' > /etc/apt/apt.conf.d/99debox-target")
 
-        lines.append(f"RUN apt-get update && {install_cmd} {all_packages_str} && apt-get clean && rm -rf /tmp/debox_debs /var/lib/apt/lists/*")
+        # The lists fetched for the pre-dependencies are still valid unless repositories were added.
+        if is_debox_base or repo_counter:
+            apt_cmds.append("apt-get update")
+        apt_cmds.append(f"{install_cmd} {all_packages_str}")
 
+    if len(apt_cmds) > len(_APT_CACHE_SETUP_CMDS):
+        if local_debs_to_install:
+            apt_cmds.append("rm -rf /tmp/debox_debs")
+        apt_cmds.extend(_APT_CACHE_TEARDOWN_CMDS)
+        lines.append(f"RUN {_APT_CACHE_MOUNTS} " + " && \\\n    ".join(apt_cmds))
+
+    # Host-specific values (user, UID, locale) are only used from here on:
+    # everything above stays cache-valid across users and hosts.
+    lines.append(f"ARG HOST_USER={host_user}")
+    lines.append(f"ARG HOST_UID={host_uid}")
+    lines.append(f"ARG HOST_LOCALE={host_locale}")
+
+    # Files and user setup, again as a single RUN layer.
+    setup_cmds = []
+    if not is_debox_base:
+        # Locale generation
+        setup_cmds.append(f"echo '{host_locale} UTF-8' >> /etc/locale.gen")
+        setup_cmds.append("locale-gen")
+        env_lines.append(f"ENV LANG={host_locale}")
+        env_lines.append(f"ENV LC_ALL={host_locale}")
     if desktop_integration_enabled and host_opener_enabled:
         lines.append("\n# --- Debox Host Opener Setup ---")
         
         lines.append("COPY debox-open /usr/local/bin/debox-open")
-        lines.append("RUN chmod +x /usr/local/bin/debox-open")
-        
-        lines.append("RUN mkdir -p /usr/share/applications")
         lines.append("COPY debox-open.desktop /usr/share/applications/debox-open.desktop")
-
-        mime_script = """
-mkdir -p /etc/xdg
-echo '[Default Applications]' > /etc/xdg/mimeapps.list
-echo 'text/html=debox-open.desktop' >> /etc/xdg/mimeapps.list
-echo 'x-scheme-handler/http=debox-open.desktop' >> /etc/xdg/mimeapps.list
-echo 'x-scheme-handler/https=debox-open.desktop' >> /etc/xdg/mimeapps.list
-"""
-        mime_oneline = " && ".join([line.strip() for line in mime_script.strip().splitlines() if line.strip()])
-        lines.append(f"RUN {mime_oneline}")
+        setup_cmds.extend(_HOST_OPENER_SETUP_CMDS)
   
-    if not is_debox_base:
-        lines.append(f"RUN useradd -m -s /bin/bash -u $HOST_UID -G video,audio,plugdev $HOST_USER")
-        lines.append(f"RUN usermod -aG sudo $HOST_USER")
-        lines.append(f'RUN echo "$HOST_USER ALL=(ALL) NOPASSWD:ALL" >> /etc/sudoers')
-    else:
-        lines.append(f"RUN usermod -aG video,audio,plugdev $HOST_USER")
+    setup_cmds.extend(_EXISTING_USER_SETUP_CMDS if is_debox_base else _NEW_USER_SETUP_CMDS)
 
     lines.append("COPY keep_alive.py /usr/local/bin/keep_alive.py")
-    lines.append("RUN chmod +x /usr/local/bin/keep_alive.py")
+    setup_cmds.append("chmod +x /usr/local/bin/keep_alive.py")
+    lines.append("RUN " + " && \\\n    ".join(setup_cmds))
+    lines.extend(env_lines)
     lines.append('CMD ["/usr/local/bin/keep_alive.py"]')
 
     return "\n".join(lines)
@@ -163,6 +254,7 @@ def _generate_podman_flags(config: dict) -> list[str]:
     runtime_cfg = config.get('runtime', {}) # Although not used directly for flags yet
     integration_cfg = config.get('integration', {})
     container_name = config['container_name']
+    home = os.path.expanduser("~") # Resolved once, reused for every path below
 
     log_debug("-> Applying configuration flags:") # Renamed log message slightly
 
@@ -257,18 +349,15 @@ def _generate_podman_flags(config: dict) -> list[str]:
     desktop_integration_enabled = integration_cfg.get('desktop_integration', True)
     if desktop_integration_enabled:
         log_debug("     - Desktop Integration: Enabled")
-        xdg_runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        environ = os.environ
+        xdg_runtime_dir = environ.get("XDG_RUNTIME_DIR")
         if not xdg_runtime_dir: log_debug("       Warning: XDG_RUNTIME_DIR not set.")
         else: flags.extend(["-v", f"{xdg_runtime_dir}:{xdg_runtime_dir}:rw"]) # Mount session dir
 
-        # Pass essential env vars
-        essential_env_vars = ["DISPLAY", "WAYLAND_DISPLAY", "XDG_RUNTIME_DIR",
-                              "DBUS_SESSION_BUS_ADDRESS", "PULSE_SERVER", "XDG_SESSION_TYPE"]
-        for var in essential_env_vars:
-             if os.environ.get(var): flags.extend(["-e", var])
+        # Pass essential env vars (podman takes the values from its own environment)
+        flags.extend(arg for var in _SESSION_ENV_VARS if environ.get(var) for arg in ("-e", var))
 
-        xauth_path = os.environ.get("XAUTHORITY", os.path.expanduser("~/.Xauthority"))
-        xdg_runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        xauth_path = environ.get("XAUTHORITY", os.path.join(home, ".Xauthority"))
 
         is_dynamic_xauth = False
         if xdg_runtime_dir and xauth_path.startswith(xdg_runtime_dir):
@@ -305,7 +394,7 @@ def _generate_podman_flags(config: dict) -> list[str]:
     log_debug("   Applying storage settings:")
     # Isolated Home (Always added)
     home_dir = config_utils.get_app_home_dir(container_name)
-    flags.extend(["-v", f"{home_dir}:{os.path.expanduser('~')}:Z"])
+    flags.extend(["-v", f"{home_dir}:{home}:Z"])
     log_debug(f"     - Isolated Home: {home_dir} -> ~")
     # Additional Volumes
     volumes = storage_cfg.get('volumes', [])
@@ -349,8 +438,7 @@ def _generate_podman_flags(config: dict) -> list[str]:
             # Mount as ~/.gnupg for the user inside container
             # Since we use --userns=keep-id, the user inside is the same as outside
             # Assuming standard home location /home/$USER
-            import getpass
-            container_user_home = f"/home/{getpass.getuser()}"
+            container_user_home = f"/home/{_get_host_details()[0]}"
             container_gpg_path = f"{container_user_home}/.gnupg"
             
             # Use :Z to allow SELinux/AppArmor access if needed, strict mapping
@@ -362,17 +450,71 @@ def _generate_podman_flags(config: dict) -> list[str]:
             log_warning(f"     - GPG Context configured but directory missing: {gpg_context_path}")
 
     log_debug("-> Finished applying configuration flags.")
-    return flags
+    return _dedupe_flags(flags)
+
+def _dedupe_flags(flags: list[str]) -> list[str]:
+    """
+    Collapses repeated mounts (same container path), devices and environment
+    variables (same name) into one flag each. The last occurrence wins, as it
+    would for '-e' in podman, but keeps the position of the first; podman
+    itself rejects a mount destination given twice.
+    """
+    deduped = []
+    positions = {} # (flag, key) -> index of its value in 'deduped'
+    i = 0
+    while i < len(flags):
+        flag = flags[i]
+        if flag in ("-v", "-e", "--device") and i + 1 < len(flags):
+            value = flags[i + 1]
+            i += 2
+        elif flag.startswith("--device="):
+            flag, value = "--device", flag.split("=", 1)[1]
+            i += 1
+        else:
+            deduped.append(flag)
+            i += 1
+            continue
+
+        if flag == "-v":
+            key = value.split(":")[1] if ":" in value else value
+        elif flag == "-e":
+            key = value.split("=", 1)[0]
+        else:
+            key = value.split(":")[0]
+
+        index = positions.get((flag, key))
+        if index is None:
+            positions[(flag, key)] = len(deduped) + 1
+            deduped.extend((flag, value))
+        else:
+            log_debug(f"     - Replacing duplicate '{flag} {deduped[index]}' with '{flag} {value}'")
+            deduped[index] = value
+    return deduped
+
+@functools.lru_cache(maxsize=None)
+def _get_host_details() -> tuple[str, int, str]:
+    """
+    Returns (user name, UID, locale) of the host user, detected once per
+    process. The locale falls back to C.UTF-8 if it cannot be determined.
+    """
+    host_locale = "C.UTF-8"
+    try:
+        loc = locale.getlocale(locale.LC_CTYPE)
+        host_locale = f"{loc[0]}.{loc[1]}" if loc[0] and loc[1] else "C.UTF-8"
+    except Exception as e:
+        log_warning(f"Failed to detect host locale ({e}), defaulting.")
+    return getpass.getuser(), os.getuid(), host_locale
 
 # --- Public Functions ---
 
-def build_container_image(config: dict, app_config_dir: Path) -> str:
+def build_container_image(config: dict, app_config_dir: Path, no_cache: bool = False) -> str:
     """
     Generates the Containerfile and builds the Podman image.
 
     Args:
         config: The loaded application configuration dictionary.
         app_config_dir: Path to the app's config dir (build context).
+        no_cache: Always build, from scratch (no skipped build, no cached layers).
 
     Returns:
         The tag of the built image (e.g., 'localhost/container_name:latest').
@@ -386,33 +528,37 @@ def build_container_image(config: dict, app_config_dir: Path) -> str:
     log_debug("--- Building Container Image ---")
     
     # Get host details
-    host_user = getpass.getuser()
-    host_uid = os.getuid()
-    host_locale = "C.UTF-8"
-    try:
-        loc = locale.getlocale(locale.LC_CTYPE)
-        host_locale = f"{loc[0]}.{loc[1]}" if loc[0] and loc[1] else "C.UTF-8"
-    except Exception as e:
-        log_warning(f"Failed to detect host locale ({e}), defaulting.")
+    host_user, host_uid, host_locale = _get_host_details()
     log_debug(f"-> Using host details: User={host_user}, UID={host_uid}, Locale={host_locale}")
 
     # Generate Containerfile content
+    # Written once; podman reads it from disk (it is also kept for reference).
+    containerfile_path = app_config_dir / "Containerfile"
     containerfile = _generate_containerfile(config, host_user, host_uid, host_locale)
-    (app_config_dir / "Containerfile").write_text(containerfile) # Save for reference
+    containerfile_path.write_text(containerfile)
     log_debug("-> Generated Containerfile.")
 
+    # Skip the build if the local image was built from exactly these inputs (its label says so).
+    # The base image is pulled first, so a newer upstream base still triggers a build.
+    base_image_id = podman_utils.pull_image_id(config['image']['base'])
+    build_hash = hash_utils.calculate_build_hash(containerfile, app_config_dir, base_image_id)
+    if not no_cache and base_image_id and podman_utils.get_image_label(image_tag, hash_utils.BUILD_HASH_LABEL) == build_hash:
+        log_debug(f"-> Build inputs unchanged since the last build of '{image_tag}'. Skipping build.")
+        return image_tag
+
     # Prepare build arguments and labels
     build_args = {"HOST_USER": host_user, "HOST_UID": str(host_uid), "HOST_LOCALE": host_locale}
-    image_label = {"debox.managed": "true"}
+    image_label = {"debox.managed": "true", hash_utils.BUILD_HASH_LABEL: build_hash}
 
     # Execute the build
     try:
         podman_utils.build_image(
-            containerfile,
+            containerfile_path,
             image_tag,
             context_dir=app_config_dir,
             build_args=build_args,
-            labels=image_label
+            labels=image_label,
+            no_cache=no_cache
         )
         log_debug(f"-> Successfully built image '{image_tag}'")
         return image_tag
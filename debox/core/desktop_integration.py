@@ -5,15 +5,13 @@ Handles exporting .desktop files, icons, and creating command aliases
 for applications installed within debox containers.
 """
 
-import configparser
+from concurrent.futures import ThreadPoolExecutor
 import glob
+import io
 from pathlib import Path
+from typing import Optional
 import os
-import shutil
-import subprocess
-import time
 import shlex
-from PIL import Image
 
 from debox.core.log_utils import log_debug, log_error, log_warning
 
@@ -21,6 +19,30 @@ from debox.core.log_utils import log_debug, log_error, log_warning
 from . import podman_utils
 from . import config_utils
 
+# Directories searched for .desktop files inside the image.
+_DESKTOP_DIRS_IN_IMAGE = ("/usr/share/applications/", "/usr/local/share/applications/")
+
+# Icon themes inside the image; themed icons keep their subdirectory on the host.
+_ICON_THEMES_DIR_IN_IMAGE = "/usr/share/icons/"
+
+# Lists (NUL-separated, for podman_utils.read_files_from_image/_container) every .desktop
+# file plus every icon named by an 'Icon=' line in them, and the fallback icon.
+# Icons are only searched in the standard icon directories, by a single find
+# whose -name tests are OR-ed together (one walk of the icon trees in total).
+_DESKTOP_AND_ICON_LIST_SCRIPT = """
+find usr/share/applications/ usr/local/share/applications/ -type f -name '*.desktop' -print0
+icons=$({ find usr/share/applications/ usr/local/share/applications/ -type f -name '*.desktop' \\
+    -exec sed -n 's/^Icon[[:space:]]*=[[:space:]]*//p' {} +; echo application-default-icon; } |
+  sed 's/[[:space:]]*$//' | sort -u)
+set --
+while IFS= read -r icon; do
+  [ -n "$icon" ] && set -- "$@" -o -name "$icon.*"
+done <<DEBOX_ICONS
+$icons
+DEBOX_ICONS
+[ $# -gt 0 ] && shift && find usr/share/icons/ usr/share/pixmaps/ \\( "$@" \\) -print0
+"""
+
 # --- Main Public Function for Installation ---
 def add_desktop_integration(config: dict):
     """
@@ -37,7 +59,8 @@ def add_desktop_integration(config: dict):
     desktop_integration_enabled = integration_cfg.get('desktop_integration', True) # Check flag
     
     desktop_files_processed = 0
-    icons_were_copied = False
+    themed_icons_added = False
+    mime_desktop_files_written = False # Only MimeType= handlers need a database update
     commands_to_alias = {}
 
     log_debug("--- Starting Desktop Integration ---")
@@ -53,28 +76,15 @@ def add_desktop_integration(config: dict):
         if not desktop_integration_enabled:
             log_debug("-> Desktop integration explicitly disabled in config. Skipping.")
         else:
-            log_debug("-> Temporarily starting container for integration...")
-            podman_utils.run_command(["podman", "start", container_name])
-            log_debug("-> Waiting for container to initialize...")
-            time.sleep(2) 
-            status = podman_utils.get_container_status(container_name)
-            log_debug(f"-> Container status: {status}")
-            if "run" not in status.lower():
-                raise RuntimeError(f"Container {container_name} failed to start properly.")
-
-            # --- 1. Find ALL .desktop files in the container ---
-            log_debug("-> Searching for .desktop files in container...")
-            find_cmd = [
-                "podman", "exec", container_name, 
-                "find", "/usr/share/applications/", "/usr/local/share/applications/", 
-                "-type", "f", "-name", "*.desktop" 
-            ]
-            process = subprocess.run(find_cmd, capture_output=True, text=True, check=False)
-            found_desktop_paths = process.stdout.strip().splitlines()
-
-            if process.returncode != 0 and not found_desktop_paths:
-                log_warning(f"'find' command for .desktop files failed: {process.stderr}")
-                return 
+            # --- 1. Read ALL .desktop files and their icons in one go ---
+            image_files = _read_desktop_and_icon_files(container_name)
+            desktop_files = {
+                path: content for path, content in image_files.items()
+                if path.startswith(_DESKTOP_DIRS_IN_IMAGE) and path.endswith(".desktop")
+            }
+            icon_files = {path: content for path, content in image_files.items() if path not in desktop_files}
+            found_desktop_paths = sorted(desktop_files)
+
             if not found_desktop_paths:
                 log_warning("No .desktop files found in the container.")
                 return
@@ -82,7 +92,7 @@ def add_desktop_integration(config: dict):
             log_debug(f"-> Found {len(found_desktop_paths)} potential .desktop file(s). Processing...")
 
             all_icon_names_to_export = set()
-            parsed_data = [] # Stores tuples: (original_path, parser_obj)
+            parsed_data = [] # Stores tuples: (original_path, original_content, sections)
 
             # --- 2. Loop 1: Parse files, gather icons & base commands ---
             log_debug("-> Processing .desktop files...")
@@ -100,22 +110,19 @@ def add_desktop_integration(config: dict):
                         log_debug(f"--> Skipping explicitly blocked app name: {Path(filename).stem}")
                         continue
 
-                    cat_cmd = ["podman", "exec", container_name, "cat", desktop_path_in_container]
-                    original_content = podman_utils.run_command(cat_cmd, capture_output=True)
-                    
-                    parser = configparser.ConfigParser(interpolation=None)
-                    parser.optionxform = str 
-                    parser.read_string(original_content)
-
-                    if 'Desktop Entry' not in parser or not parser.getboolean('Desktop Entry', 'NoDisplay', fallback=False) is False:
-                        if 'Desktop Entry' in parser and parser.getboolean('Desktop Entry', 'NoDisplay', fallback=False):
-                            log_debug(f"--> Skipping hidden file (NoDisplay=true): {desktop_path_in_container}")
-                        else:
-                            log_debug(f"--> Skipping invalid file (no [Desktop Entry]): {desktop_path_in_container}")
+                    original_content = desktop_files[desktop_path_in_container].decode('utf-8', errors='replace')
+                    # The filters below only read [Desktop Entry]; the whole file is parsed once it passes.
+                    main_entry = _parse_desktop_file(original_content, only_section='Desktop Entry').get('Desktop Entry')
+
+                    if main_entry is None:
+                        log_debug(f"--> Skipping invalid file (no [Desktop Entry]): {desktop_path_in_container}")
+                        continue
+                    if _is_true(main_entry.get('NoDisplay', 'false')):
+                        log_debug(f"--> Skipping hidden file (NoDisplay=true): {desktop_path_in_container}")
                         continue
 
                     # --- Check Categories using config ---
-                    categories_str = parser.get('Desktop Entry', 'Categories', fallback='')
+                    categories_str = main_entry.get('Categories', '')
                     # Ensure categories are split correctly, handling potential multiple semicolons
                     categories = set(cat.strip() for cat in categories_str.split(';') if cat.strip())
                     
@@ -124,10 +131,11 @@ def add_desktop_integration(config: dict):
                         log_debug(f"--> Skipping file due to category: {desktop_path_in_container} (Categories: {categories_str})")
                         continue
                     
+                    sections = _parse_desktop_file(original_content)
+
                     # Collect icons and find base commands from all sections
                     has_exec = False
-                    for section_name in parser.sections():
-                        section = parser[section_name]
+                    for section in sections.values():
                         if 'Exec' in section:
                             has_exec = True
                             try:
@@ -143,9 +151,9 @@ def add_desktop_integration(config: dict):
                         icon_in_section = section.get('Icon')
                         if icon_in_section:
                             all_icon_names_to_export.add(icon_in_section)                    
-                    # Only store parser if it had an Exec command
+                    # Only store the file if it had an Exec command
                     if has_exec:
-                        parsed_data.append((desktop_path_in_container, parser))
+                        parsed_data.append((desktop_path_in_container, original_content, sections))
                         desktop_files_processed += 1
                     else:
                         log_debug(f"--> Skipping file with no Exec command: {desktop_path_in_container}")
@@ -165,87 +173,80 @@ def add_desktop_integration(config: dict):
             log_debug(f"-> Identified {len(final_icon_list)} unique icon name(s) to export: {final_icon_list}")
 
             # --- 3. Call icon export function with the full list ---
-            icons_were_copied = _export_icons(container_name, final_icon_list)
+            themed_icons_added = _export_icons(container_name, icon_files, final_icon_list)
 
-            # --- 4. Loop 2: Modify Exec/Icon entries and save .desktop files ---
+            # --- 4. Loop 2: Modify Exec/Icon/Name entries and save .desktop files ---
             log_debug("-> Saving integrated .desktop files...")
-            for original_path, parser in parsed_data: # Removed original_exec_map from tuple
+            # Construct the new Exec lines using the ABSOLUTE PATH to the alias
+            # This bypasses the need for ~/.local/bin to be in $PATH immediately
+            local_bin_dir = Path(os.path.expanduser("~/.local/bin"))
+            name_suffix = f" ({container_name})"
+
+            for original_path, original_content, sections in parsed_data:
                 original_filename = Path(original_path).name
 
-                if forced_wm_class:
-                    if not parser.has_section('Desktop Entry'):
-                        parser.add_section('Desktop Entry')
-                    parser.set('Desktop Entry', 'StartupWMClass', forced_wm_class)
-                    log_debug(f"    Forcing StartupWMClass={forced_wm_class} (from config)")
-                
-                # Modify Exec and Icon entries in all sections
-                for section_name in parser.sections():
-                    section = parser[section_name]
-                    
+                def edit_value(section_name: str, key: str, value: str) -> str:
                     # --- Modify 'Exec' line to use the ALIAS ---
-                    if 'Exec' in section:
-                        original_exec = section['Exec']
+                    if key == 'Exec':
                         try:
                             # Split original command to separate command from args
-                            exec_parts_orig = shlex.split(original_exec)
-                            if not exec_parts_orig: continue # Skip empty Exec lines
-
-                            original_base_command = exec_parts_orig[0]
-                            original_args = exec_parts_orig[1:] # Keep original args like %F, %u
+                            exec_parts_orig = shlex.split(value)
+                            if not exec_parts_orig: return value # Skip empty Exec lines
 
-                            # Determine the alias name for this command
-                            command_name_only = Path(original_base_command).name 
+                            # Keep original args like %F, %u
+                            command_name_only = Path(exec_parts_orig[0]).name 
                             alias_name = alias_map.get(command_name_only, command_name_only)
-
-                            # Construct the new Exec line using the ABSOLUTE PATH to the alias
-                            # This bypasses the need for ~/.local/bin to be in $PATH immediately
-                            local_bin_dir = Path(os.path.expanduser("~/.local/bin"))
-                            alias_path_str = str(local_bin_dir / alias_name)
-
-                            new_exec_parts = [alias_path_str] + original_args
-                            section['Exec'] = " ".join(shlex.quote(part) for part in new_exec_parts)
-
+                            new_exec_parts = [str(local_bin_dir / alias_name)] + exec_parts_orig[1:]
+                            return " ".join(shlex.quote(part) for part in new_exec_parts)
                         except Exception as e:
-                            log_warning(f"--> Could not parse/modify Exec='{original_exec}' in section [{section_name}] of {original_filename}: {e}")
-                            # Keep original Exec line if modification fails
-                    
+                            log_warning(f"--> Could not parse/modify Exec='{value}' in section [{section_name}] of {original_filename}: {e}")
+                            return value # Keep original Exec line if modification fails
                     # Prefix Icon name
-                    original_icon_name = section.get('Icon')
-                    if original_icon_name:
-                        prefixed_icon_name = f"{container_name}_{original_icon_name}"
-                        section['Icon'] = prefixed_icon_name
-                    elif section_name == 'Desktop Entry' and final_icon_list: # Fallback for main entry
-                        section['Icon'] = f"{container_name}_{final_icon_list[0]}"
-
-                    # Modify main Name entry
-                    for key, value in parser.items(section_name):
-                        if key == 'Name' or key.startswith('Name['):
-                            suffix = f" ({container_name})"
-                            if suffix not in value:
-                                parser.set(section_name, key, f"{value}{suffix}")
-                                log_debug(f"    Updated {key}: {value} -> {parser.get(section_name, key)}")
+                    if key == 'Icon' and value:
+                        return f"{container_name}_{value}"
+                    if key == 'Icon' and section_name == 'Desktop Entry' and final_icon_list: # Fallback for main entry
+                        return f"{container_name}_{final_icon_list[0]}"
+                    # Modify Name entries
+                    if (key == 'Name' or key.startswith('Name[')) and name_suffix not in value:
+                        log_debug(f"    Updated {key}: {value} -> {value}{name_suffix}")
+                        return f"{value}{name_suffix}"
+                    if key == 'StartupWMClass' and section_name == 'Desktop Entry' and forced_wm_class:
+                        return forced_wm_class
+                    return value
+
+                main_additions = {}
+                main_entry = sections['Desktop Entry']
+                if forced_wm_class:
+                    log_debug(f"    Forcing StartupWMClass={forced_wm_class} (from config)")
+                    if 'StartupWMClass' not in main_entry:
+                        main_additions['StartupWMClass'] = forced_wm_class
+                if 'Icon' not in main_entry and final_icon_list: # Fallback for main entry
+                    main_additions['Icon'] = f"{container_name}_{final_icon_list[0]}"
+
+                new_content = _rewrite_desktop_file(original_content, edit_value, {'Desktop Entry': main_additions})
 
                 # Construct final path on host using prefixed filename
                 final_desktop_filename = f"{container_name}_{original_filename}"
                 final_desktop_path = config_utils.DESKTOP_FILES_DIR / final_desktop_filename
                 
                 try:
-                    with open(final_desktop_path, 'w') as f:
-                        parser.write(f, space_around_delimiters=False)
+                    final_desktop_path.write_text(new_content)
                     log_debug(f"--> Saved: {final_desktop_path}")
+                    if 'MimeType' in main_entry:
+                        mime_desktop_files_written = True
                 except Exception as write_e:
                     log_error(f"--> Error writing {final_desktop_path}: {write_e}")
 
             # --- 5. Update caches ---
-            if icons_were_copied:
-                log_debug("-> Updating host icon cache...")
-                try: # Add try-except for robustness
-                    podman_utils.run_command(["gtk-update-icon-cache", "-f", "-t", str(Path(os.path.expanduser("~/.local/share/icons")))])
-                except Exception as cache_e:
-                    log_warning(f"Failed to update icon cache: {cache_e}")
-                
-            log_debug("-> Updating host desktop application database...")
-            podman_utils.run_command(["update-desktop-database", str(config_utils.DESKTOP_FILES_DIR)])
+            # update-desktop-database only rebuilds mimeinfo.cache (the MimeType= handlers);
+            # menus pick up new .desktop files by themselves.
+            # The icon cache only covers ~/.local/share/icons (not ~/.local/share/pixmaps).
+            if not mime_desktop_files_written:
+                log_debug("-> No MIME types declared. Desktop application database left unchanged.")
+            _update_host_caches(
+                Path(os.path.expanduser("~/.local/share/icons")) if themed_icons_added else None,
+                mime_desktop_files_written
+            )
 
             log_debug(f"-> Successfully integrated {desktop_files_processed} application(s).")
             log_debug("--- Desktop Integration Complete ---")
@@ -278,10 +279,98 @@ def add_desktop_integration(config: dict):
     except Exception as e:
         log_error(f"Desktop file export process failed: {e}")
         raise e
-    finally:
-        # Stop the temporary container
-        log_debug("-> Stopping temporary container used for integration...")
-        podman_utils.run_command(["podman", "stop", "--time=2", container_name])
+
+def _update_host_caches(icon_dir: Optional[Path], update_desktop_database: bool):
+    """
+    Rebuilds the host's icon cache for icon_dir (if given) and the desktop
+    MIME database (if requested). The two tools are independent, so when
+    both are needed they run side by side. Failures only produce warnings.
+    """
+    commands = []
+    if icon_dir:
+        log_debug("-> Updating host icon cache...")
+        commands.append(("icon cache", ["gtk-update-icon-cache", "-f", "-t", str(icon_dir)]))
+    if update_desktop_database:
+        log_debug("-> Updating host desktop application database...")
+        commands.append(("desktop database", ["update-desktop-database", str(config_utils.DESKTOP_FILES_DIR)]))
+    if not commands:
+        return
+
+    with ThreadPoolExecutor(max_workers=len(commands)) as executor:
+        futures = [(label, executor.submit(podman_utils.run_command, command)) for label, command in commands]
+    for label, future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            log_warning(f"Failed to update {label}: {e}")
+
+def _parse_desktop_file(content: str, only_section: Optional[str] = None) -> dict[str, dict[str, str]]:
+    """
+    Reads the key/value pairs of a .desktop file, per [section], in one pass.
+    Comments and blank lines are ignored; for repeated keys the last one wins.
+    With only_section, other sections are skipped and reading stops at the
+    end of that section (it appears once per file).
+    """
+    sections = {}
+    current = None
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if not line or line[0] == '#':
+            continue
+        if line[0] == '[' and line[-1] == ']':
+            name = line[1:-1]
+            if only_section is not None and name != only_section:
+                if current is not None:
+                    break
+                continue
+            current = sections.setdefault(name, {})
+        elif current is not None:
+            key, sep, value = line.partition('=')
+            if sep:
+                current[key.strip()] = value.strip()
+    return sections
+
+def _rewrite_desktop_file(content: str, edit_value, additions: dict[str, dict[str, str]]) -> str:
+    """
+    Rewrites a .desktop file line by line. Every key/value line is passed
+    through edit_value(section, key, value); lines whose value changes are
+    written as 'key=value', all others (comments included) are kept verbatim.
+    Keys in additions[section] are appended after the last entry of that section.
+    """
+    output = []
+    current = None
+    insert_at = None # Index after the last non-blank line of the current section
+
+    def flush_additions():
+        extra = additions.get(current)
+        if extra and insert_at is not None:
+            output[insert_at:insert_at] = [f"{key}={value}" for key, value in extra.items()]
+
+    for raw_line in content.splitlines():
+        line = raw_line.strip()
+        if line.startswith('[') and line.endswith(']'):
+            flush_additions()
+            current = line[1:-1]
+            output.append(raw_line)
+            insert_at = len(output)
+            continue
+
+        if current is not None and line and not line.startswith('#') and '=' in line:
+            key, value = line.split('=', 1)
+            key, value = key.strip(), value.strip()
+            new_value = edit_value(current, key, value)
+            output.append(raw_line if new_value == value else f"{key}={new_value}")
+        else:
+            output.append(raw_line)
+        if line:
+            insert_at = len(output)
+
+    flush_additions()
+    return "\n".join(output) + "\n"
+
+def _is_true(value: str) -> bool:
+    """Interprets a .desktop boolean (also accepting the configparser spellings)."""
+    return value.strip().lower() in ('1', 'yes', 'true', 'on')
 
 def _create_alias_script(alias_name: str, container_name: str, base_command: str):
     """
@@ -316,136 +405,189 @@ debox run {container_name} -- {base_command} "$@"
         log_error(f"--> Failed to create alias script {alias_path}: {e}")
         raise
     
-def _export_icons(container_name: str, icon_names: list[str]) -> bool:
+def _read_desktop_and_icon_files(container_name: str) -> dict[str, bytes]:
+    """
+    Reads the .desktop files and their icons (see _DESKTOP_AND_ICON_LIST_SCRIPT).
+    A container that has already run (e.g. for post-install hooks) may hold
+    files created at runtime, so they are read from it, started temporarily
+    if it is stopped. A container that has never run, or none at all, holds
+    exactly the image's files, so they are read from the image instead.
     """
-    Finds icon files inside the container for a list of base names,
-    copies them to the corresponding user directories on the host,
-    prefixing the filename with the container name.
+    status = podman_utils.get_container_status(container_name).lower()
+    if "running" not in status and "exited" not in status and "stopped" not in status:
+        log_debug("-> Reading .desktop files and icons from the application image...")
+        return podman_utils.read_files_from_image(f"localhost/{container_name}:latest", _DESKTOP_AND_ICON_LIST_SCRIPT)
+
+    was_stopped = "running" not in status
+    if was_stopped:
+        log_debug(f"-> Container {container_name} is stopped. Starting temporarily to read .desktop files...")
+        podman_utils.run_command(["podman", "start", container_name], check=True)
+        if not podman_utils.wait_until_running(container_name):
+            log_debug(f"-> Container {container_name} did not report 'running'. Trying to read anyway.")
+    try:
+        log_debug("-> Reading .desktop files and icons from the container...")
+        return podman_utils.read_files_from_container(container_name, _DESKTOP_AND_ICON_LIST_SCRIPT)
+    finally:
+        if was_stopped:
+            log_debug(f"-> Stopping temporary container {container_name}...")
+            podman_utils.run_command(["podman", "stop", "--time=2", container_name], check=False)
+
+def _export_icons(container_name: str, icon_files: dict[str, bytes], icon_names: list[str]) -> bool:
+    """
+    Picks the icon files matching a list of base names out of the files read
+    from the application image, copies them to the corresponding user
+    directories on the host, prefixing the filename with the container name.
+    Icons with different file names are independent of each other, so they
+    are installed on a small thread pool (Pillow releases the GIL while
+    decoding and resizing). Icons that share a file name may end up at the
+    same destination, so they are installed one after another, in order.
 
     Args:
         container_name: The name of the container (e.g., 'debox-firefox').
+        icon_files: Icon files read from the image ({path_in_image: content}).
         icon_names: A list of base icon names to search for (e.g., ['firefox-esr']).
 
     Returns:
-        True if at least one icon was successfully copied, False otherwise.
+        True if at least one icon was installed under ~/.local/share/icons
+        (i.e. the icon cache needs a refresh), False otherwise.
     """
-    icons_copied_count = 0
+    icon_names = [icon_name for icon_name in icon_names if icon_name] # Skip empty names
     log_debug(f"-> Starting icon export for names: {icon_names}")
 
+    # Index the files by every name they can match: 'a.b.png' is found for 'a' and 'a.b'.
+    icons_by_name = {}
+    for icon_path in sorted(icon_files):
+        stem = icon_path.rpartition('/')[2]
+        dot = stem.find('.')
+        while dot > 0:
+            icons_by_name.setdefault(stem[:dot], []).append(icon_path)
+            dot = stem.find('.', dot + 1)
+
+    tasks = []
+    for icon_name in icon_names:
+        found_icons = icons_by_name.get(icon_name, [])
+        if not found_icons:
+             log_debug(f"--> No icon files found for '{icon_name}'.")
+             continue # Try next icon name
+
+        log_debug(f"--> Found {len(found_icons)} icon file(s) for '{icon_name}'. Copying with prefix...")
+        tasks.extend((icon_name, icon_path, icon_files[icon_path]) for icon_path in found_icons)
+
+    # Create each themed destination directory once, instead of once per icon.
     user_icon_dir = Path(os.path.expanduser("~/.local/share/icons"))
+    for theme_dir in {_themed_icon_dir(user_icon_dir, icon_path) for _, icon_path, _ in tasks} - {None}:
+        theme_dir.mkdir(parents=True, exist_ok=True)
+
+    # Group by '<icon_name><ext>': only icons in the same group can be written to the same file.
+    task_groups = {}
+    for task in tasks:
+        icon_name, icon_path, _ = task
+        task_groups.setdefault((icon_name, Path(icon_path).suffix.lower()), []).append(task)
+
+    def install_group(group: list) -> list[Path]:
+        paths = (_install_icon(user_icon_dir, container_name, *task) for task in group)
+        return [path for path in paths if path]
+
+    installed_paths = []
+    if task_groups:
+        with ThreadPoolExecutor(max_workers=min(8, len(task_groups))) as executor:
+            for paths in executor.map(install_group, task_groups.values()):
+                installed_paths.extend(paths)
+    
+    if installed_paths:
+        log_debug(f"-> Successfully copied {len(installed_paths)} total icon file(s).")
+    else:
+        log_debug("-> No icons were copied.")
+    return any(user_icon_dir in path.parents for path in installed_paths)
+
+def _themed_icon_dir(user_icon_dir: Path, icon_path_in_container: str) -> Optional[Path]:
+    """
+    Returns the host directory for an icon from an icon theme (the path below
+    /usr/share/icons/ mirrored under ~/.local/share/icons), or None for other
+    images (pixmaps).
+    """
+    if not icon_path_in_container.startswith(_ICON_THEMES_DIR_IN_IMAGE):
+        return None
+    relative_dir = icon_path_in_container[len(_ICON_THEMES_DIR_IN_IMAGE):].rpartition('/')[0]
+    return user_icon_dir / relative_dir if relative_dir else user_icon_dir
+
+def _install_icon(user_icon_dir: Path, container_name: str, icon_name: str, icon_path_in_container: str, icon_data: bytes) -> Optional[Path]:
+    """
+    Installs one icon file on the host (below user_icon_dir, i.e.
+    ~/.local/share/icons) as '<container_name>_<icon_name><ext>'.
+    Themed icons keep their theme/size subdirectory, other images are sorted
+    into hicolor by size (resized to 256x256 if needed), unreadable ones go
+    to ~/.local/share/pixmaps.
+
+    Returns:
+        The path of the installed icon file, or None if it was not installed.
+    """
+    # Pillow is only needed for resizing non-themed icons; keep it off the import path.
+    from PIL import Image
+
     TARGET_SIZE = 256 
     fallback_base_dir = user_icon_dir / "hicolor"
-    
-    temp_icon_dir = Path("/tmp/debox_icons_temp")
-    if temp_icon_dir.exists(): shutil.rmtree(temp_icon_dir)
-    temp_icon_dir.mkdir(parents=True, exist_ok=True)
 
-    for icon_name in icon_names:
-        if not icon_name: # Skip empty names
-            continue
-        log_debug(f"--> Searching for icons matching '{icon_name}.*'...")
-        try:
-            # Search only in standard icon directories
-            find_icon_cmd = ["podman", "exec", container_name, "find", "/usr/share/icons/", "/usr/share/pixmaps/", "-name", f"{icon_name}.*"]
-            process_icons = subprocess.run(find_icon_cmd, capture_output=True, text=True, check=False)
-            found_icons = process_icons.stdout.strip().splitlines()
-
-            if process_icons.returncode != 0 and not found_icons:
-                log_debug(f"--> Warning: 'find' command failed for icons named '{icon_name}': {process_icons.stderr}")
-                continue # Try next icon name
-            if not found_icons:
-                 log_debug(f"--> No icon files found for '{icon_name}'.")
-                 continue # Try next icon name
-
-            log_debug(f"--> Found {len(found_icons)} icon file(s) for '{icon_name}'. Copying with prefix...")
+    try:
+        icon_path_in_container_obj = Path(icon_path_in_container)
+        icon_extension = icon_path_in_container_obj.suffix.lower()
+        final_icon_name = f"{container_name}_{icon_name}{icon_extension}"
+        
+        final_dest_path = None
+
+        host_subdir = _themed_icon_dir(user_icon_dir, icon_path_in_container)
+        if host_subdir is not None:
+            # Created up front by _export_icons
+            final_dest_path = host_subdir / final_icon_name
             
-            for icon_path_in_container in found_icons:
-                try:
-                    icon_path_in_container_obj = Path(icon_path_in_container)
-                    icon_extension = icon_path_in_container_obj.suffix.lower()
-                    final_icon_name = f"{container_name}_{icon_name}{icon_extension}"
-                    
-                    path_parts = icon_path_in_container_obj.parts
-                    final_dest_path = None
+            final_dest_path.write_bytes(icon_data)
+            log_debug(f"    Copied (Standard): {final_dest_path}")
+            return final_dest_path
 
-                    if "icons" in path_parts:
-                        try:
-                            icons_index = path_parts.index("icons")
-                            relative_path = Path(*path_parts[icons_index+1:]).parent
-                            host_subdir = user_icon_dir / relative_path
-                            host_subdir.mkdir(parents=True, exist_ok=True)
-                            final_dest_path = host_subdir / final_icon_name
-                            
-                            podman_utils.run_command(
-                                ["podman", "cp", f"{container_name}:{icon_path_in_container}", str(final_dest_path)],
-                                check=True
-                            )
-                            log_debug(f"    Copied (Standard): {final_dest_path}")
-                            icons_copied_count += 1
-                            continue 
-                        except ValueError:
-                            pass
-
-                    temp_path = temp_icon_dir / final_icon_name
-                    podman_utils.run_command(
-                        ["podman", "cp", f"{container_name}:{icon_path_in_container}", str(temp_path)],
-                        check=True
-                    )
-                    
-                    target_dir = None
+        target_dir = None
+        
+        if icon_extension == ".svg":
+            target_dir = fallback_base_dir / "scalable" / "apps"
+            target_dir.mkdir(parents=True, exist_ok=True)
+            final_dest_path = target_dir / final_icon_name
+            final_dest_path.write_bytes(icon_data)
+            
+        else:
+            # Decoded straight from the archived bytes; no temporary file on disk.
+            try:
+                with Image.open(io.BytesIO(icon_data)) as img:
+                    w, h = img.size
                     
-                    if icon_extension == ".svg":
-                        target_dir = fallback_base_dir / "scalable" / "apps"
-                        target_dir.mkdir(parents=True, exist_ok=True)
-                        final_dest_path = target_dir / final_icon_name
-                        shutil.move(str(temp_path), str(final_dest_path))
-                        
+                    if w == h and w <= 512:
+                        size_folder = f"{w}x{h}"
+                        output_data = icon_data
                     else:
-                        try:
-                            with Image.open(temp_path) as img:
-                                w, h = img.size
-                                
-                                if w == h and w <= 512:
-                                    size_folder = f"{w}x{h}"
-                                else:
-                                    log_debug(f"    Resizing icon from {w}x{h} to {TARGET_SIZE}x{TARGET_SIZE}")
-                                    img = img.resize((TARGET_SIZE, TARGET_SIZE), Image.Resampling.LANCZOS)
-                                    img.save(temp_path)
-                                    size_folder = f"{TARGET_SIZE}x{TARGET_SIZE}"
-
-                                target_dir = fallback_base_dir / size_folder / "apps"
-                                target_dir.mkdir(parents=True, exist_ok=True)
-                                final_dest_path = target_dir / final_icon_name
-                                
-                                shutil.copy2(str(temp_path), str(final_dest_path))
-
-                        except Exception as img_e:
-                            log_warning(f"Failed to process image {temp_path}: {img_e}")
-                            legacy_dir = Path(os.path.expanduser("~/.local/share/pixmaps"))
-                            legacy_dir.mkdir(parents=True, exist_ok=True)
-                            final_dest_path = legacy_dir / final_icon_name
-                            shutil.move(str(temp_path), str(final_dest_path))
-                    
-                    if final_dest_path and final_dest_path.exists():
-                        log_debug(f"    Processed & Installed: {final_dest_path}")
-                        icons_copied_count += 1
-                   
-                except Exception as copy_e:
-                    log_error(f"--> Copying icon {icon_path_in_container} failed: {copy_e}")
-
-        except Exception as find_e:
-            log_error(f"--> Finding icons for '{icon_name}' failed: {find_e}")
-
-    try:
-        shutil.rmtree(temp_icon_dir)
-    except: pass
-    
-    if icons_copied_count > 0:
-        log_debug(f"-> Successfully copied {icons_copied_count} total icon file(s).")
-        return True
-    else:
-        log_debug("-> No icons were copied.")
-        return False
+                        log_debug(f"    Resizing icon from {w}x{h} to {TARGET_SIZE}x{TARGET_SIZE}")
+                        output = io.BytesIO()
+                        img.resize((TARGET_SIZE, TARGET_SIZE), Image.Resampling.LANCZOS).save(output, format=img.format)
+                        output_data = output.getvalue()
+                        size_folder = f"{TARGET_SIZE}x{TARGET_SIZE}"
+
+                target_dir = fallback_base_dir / size_folder / "apps"
+                target_dir.mkdir(parents=True, exist_ok=True)
+                final_dest_path = target_dir / final_icon_name
+                
+                final_dest_path.write_bytes(output_data)
+
+            except Exception as img_e:
+                log_warning(f"Failed to process image {icon_path_in_container}: {img_e}")
+                legacy_dir = Path(os.path.expanduser("~/.local/share/pixmaps"))
+                legacy_dir.mkdir(parents=True, exist_ok=True)
+                final_dest_path = legacy_dir / final_icon_name
+                final_dest_path.write_bytes(icon_data)
+        
+        if final_dest_path and final_dest_path.exists():
+            log_debug(f"    Processed & Installed: {final_dest_path}")
+            return final_dest_path
+       
+    except Exception as copy_e:
+        log_error(f"--> Copying icon {icon_path_in_container} failed: {copy_e}")
+    return None
     
 # --- Main Public Function for Removal ---
 def remove_desktop_integration(container_name: str, config: dict):
@@ -455,7 +597,9 @@ def remove_desktop_integration(container_name: str, config: dict):
     """
     log_debug(f"--- Removing Desktop Integration for {container_name} ---")
     desktop_files_removed_count = 0
+    mime_desktop_files_removed = False # Only MimeType= handlers need a database update
     icon_removed_count = 0
+    themed_icons_removed = False
     aliases_removed_count = 0
     
     # Get alias map from config (needed to find correct alias scripts)
@@ -476,13 +620,14 @@ def remove_desktop_integration(container_name: str, config: dict):
                 log_debug(f"-> Processing for alias extraction: {desktop_path}")
                 try:
                     # Parse desktop file BEFORE removing to find Exec command
-                    temp_parser = configparser.ConfigParser(interpolation=None)
-                    temp_parser.optionxform = str
-                    temp_parser.read(desktop_path) 
+                    sections = _parse_desktop_file(desktop_path.read_text(errors='replace'), only_section='Desktop Entry')
+
+                    if 'MimeType' in sections.get('Desktop Entry', {}):
+                        mime_desktop_files_removed = True
 
                     # Extract alias from Exec= line (assuming it's the first word)
-                    if 'Desktop Entry' in temp_parser:
-                        exec_line = temp_parser.get('Desktop Entry', 'Exec', fallback=None)
+                    if 'Desktop Entry' in sections:
+                        exec_line = sections['Desktop Entry'].get('Exec')
                         if exec_line:
                             try:
                                 alias_name_in_exec = shlex.split(exec_line)[0] 
@@ -515,6 +660,7 @@ def remove_desktop_integration(container_name: str, config: dict):
                     try:
                         icon_path.unlink()
                         icon_removed_count += 1
+                        themed_icons_removed = True
                     except OSError as e:
                         log_warning(f"-> Could not remove icon {icon_path}: {e}")
         
@@ -555,22 +701,12 @@ def remove_desktop_integration(container_name: str, config: dict):
 
 
         # --- Update Caches ---
-        if desktop_files_removed_count > 0:
-            log_debug("-> Updating desktop application database...")
-            try: 
-                podman_utils.run_command(["update-desktop-database", str(config_utils.DESKTOP_FILES_DIR)])
-            except Exception as db_e:
-                log_warning(f"Failed to update desktop database: {db_e}")
-
         if icon_removed_count > 0:
             log_debug(f"-> Removed {icon_removed_count} icon file(s).")
-            log_debug("-> Updating icon cache...")
-            try:
-                podman_utils.run_command(["gtk-update-icon-cache", "-f", "-t", str(user_icon_dir)])
-            except Exception as cache_e:
-                log_warning(f"Failed to update icon cache: {cache_e}")
         else:
             log_debug("-> No icon files found or removed.")
+        # Pixmaps are not part of the icon cache; only themed icon removals need a refresh.
+        _update_host_caches(user_icon_dir if themed_icons_removed else None, bool(mime_desktop_files_removed))
             
         if aliases_removed_count > 0:
             log_debug(f"-> Removed {aliases_removed_count} alias script(s).")
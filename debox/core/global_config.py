@@ -6,6 +6,7 @@ Manages the global debox configuration file (e.g., ~/.config/debox/debox.conf).
 import os
 import configparser
 from pathlib import Path
+from typing import Optional
 
 # --- Constants ---
 GLOBAL_CONFIG_DIR = Path(os.path.expanduser("~/.config/debox"))
@@ -16,8 +17,12 @@ GLOBAL_CONFIG_FILE = GLOBAL_CONFIG_DIR / "debox.conf"
 DEFAULT_REGISTRY_HOST = "localhost"
 DEFAULT_REGISTRY_PORT = "5000"
 DEFAULT_REGISTRY_NAME = "debox-registry"
+STORAGE_DIR = Path(os.path.expanduser("~/.local/share/debox/registry"))
 # --- End Registry Constants ---
 
+# (file signature, (host, port, name)) of the last parsed config file.
+_registry_settings_cache: Optional[tuple] = None
+
 def _load_config() -> configparser.ConfigParser:
     """Loads the config file, applying defaults if it doesn't exist."""
     config = configparser.ConfigParser()
@@ -42,16 +47,39 @@ def save_global_config(config: configparser.ConfigParser):
     except Exception as e:
         print(f"Warning: Could not save global config file: {e}")
 
+def _get_registry_settings() -> tuple[str, str, str]:
+    """
+    Returns (host, port, name) of the registry. The config file is parsed
+    again only when its modification time, size or inode changed (or it
+    appeared or disappeared) since the last call.
+    """
+    global _registry_settings_cache
+    try:
+        stat = os.stat(GLOBAL_CONFIG_FILE)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except OSError:
+        signature = None
+
+    cached = _registry_settings_cache
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    config = _load_config()
+    settings = (
+        config.get('registry', 'host', fallback=DEFAULT_REGISTRY_HOST),
+        config.get('registry', 'port', fallback=DEFAULT_REGISTRY_PORT),
+        config.get('registry', 'name', fallback=DEFAULT_REGISTRY_NAME),
+    )
+    _registry_settings_cache = (signature, settings)
+    return settings
+
 # --- Public Getter Functions ---
 
 def get_registry_address() -> str:
     """Gets the full registry address (e.g., 'localhost:5000')."""
-    config = _load_config()
-    host = config.get('registry', 'host', fallback=DEFAULT_REGISTRY_HOST)
-    port = config.get('registry', 'port', fallback=DEFAULT_REGISTRY_PORT)
+    host, port, _ = _get_registry_settings()
     return f"{host}:{port}"
 
 def get_registry_name() -> str:
     """Gets the name of the registry container (e.g., 'debox-registry')."""
-    config = _load_config()
-    return config.get('registry', 'name', fallback=DEFAULT_REGISTRY_NAME)
\ No newline at end of file
+    return _get_registry_settings()[2]
\ No newline at end of file
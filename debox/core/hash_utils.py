@@ -10,6 +10,7 @@ import hashlib
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from debox.core.config_utils import write_file_atomic
 from debox.core.log_utils import log_debug, log_error, log_warning
 
 # Define the sections we care about hashing
@@ -18,13 +19,19 @@ SECTIONS_TO_HASH = ['image', 'storage', 'runtime', 'integration', 'permissions',
 # --- Constants for state files ---
 STATE_FILE_NAME = ".last_applied_state.json"
 FLAG_FILE_NAME = ".needs_apply"
-STATUS_FILE_NAME = ".installation_status"
+STATUS_FILE_NAME = ".installation_status" # Legacy; the status now lives in the state file
 
 # --- Constants for status ---
 STATUS_INSTALLED = "INSTALLED"
 STATUS_NOT_INSTALLED = "NOT_INSTALLED"
 
+# Image label holding the build hash (see calculate_build_hash) of the inputs an image was built from.
+BUILD_HASH_LABEL = "debox.build_hash"
+
 STATE_KEY_REGISTRY_DIGEST = "registry_digest"
+STATE_KEY_CONFIG_MTIME = "config_mtime"
+STATE_KEY_CONTENT_HASH = "content_hash"
+STATE_KEY_INSTALLATION_STATUS = "installation_status"
 
 
 def _calculate_section_hash(section_data: Any) -> str:
@@ -40,6 +47,13 @@ def _calculate_section_hash(section_data: Any) -> str:
     
     return hashlib.sha256(serialized_data).hexdigest()
 
+def calculate_content_hash(config_path: Path) -> str:
+    """
+    Returns the SHA256 hash of the raw config.yml bytes.
+    Identical bytes mean identical sections, so apply can skip the YAML parse.
+    """
+    return hashlib.sha256(config_path.read_bytes()).hexdigest()
+
 def calculate_hashes(config: dict) -> Dict[str, str]:
     """
     Calculates hashes for key configuration sections to detect changes.
@@ -75,14 +89,17 @@ def get_last_applied_hashes(app_config_dir: Path) -> Dict[str, str]:
         log_warning(f"Could not read state file {state_file}: {e}")
         return {} # Treat unreadable state as needing update
 
-def save_last_applied_hashes(app_config_dir: Path, hashes: Dict[str, str]):
+def save_last_applied_hashes(app_config_dir: Path, hashes: Dict[str, str], config_mtime: Optional[int] = None):
     """
     Saves the given hashes to the .last_applied_state.json file.
+    If config_mtime (config.yml st_mtime_ns) is given, it is recorded alongside
+    the hashes so a later apply can skip hashing an untouched config.
     """
     state_file = app_config_dir / STATE_FILE_NAME
+    if config_mtime is not None:
+        hashes = {**hashes, STATE_KEY_CONFIG_MTIME: config_mtime}
     try:
-        with open(state_file, 'w') as f:
-            json.dump(hashes, f, indent=2)
+        write_file_atomic(state_file, json.dumps(hashes, indent=2))
         log_debug(f"-> Saved applied state to {state_file}")
     except Exception as e:
         log_error(f"Saving applied state to {state_file} failed: {e}")
@@ -98,6 +115,22 @@ def remove_last_applied_hashes(app_config_dir: Path):
         except Exception as e:
             log_warning(f"Could not remove state file {state_file}: {e}")
 
+def is_applied_state_current(app_config_dir: Path, config_mtime: int) -> bool:
+    """
+    Returns True if no change is pending: the .needs_apply flag is absent and
+    config.yml has not been modified since the state was last saved.
+    """
+    if has_needs_apply_flag(app_config_dir):
+        return False
+    saved_mtime = get_last_applied_hashes(app_config_dir).get(STATE_KEY_CONFIG_MTIME)
+    return saved_mtime is not None and saved_mtime == config_mtime
+
+def has_needs_apply_flag(app_config_dir: Path) -> bool:
+    """
+    Checks whether the .needs_apply flag file is present.
+    """
+    return (app_config_dir / FLAG_FILE_NAME).is_file()
+
 def create_needs_apply_flag(app_config_dir: Path):
     """
     Creates the .needs_apply flag file to signal a configuration change.
@@ -119,11 +152,27 @@ def remove_needs_apply_flag(app_config_dir: Path):
         except Exception as e:
             log_warning(f"Could not remove .needs_apply flag: {e}")
 
+def finalize_applied_state(app_config_dir: Path, hashes: Dict[str, str], config_mtime: Optional[int] = None):
+    """
+    Records a successful install/apply: saves the hashes together with the
+    INSTALLED status in one atomic write of the state file, then removes the
+    .needs_apply flag. The flag goes last, so an interrupted finalize still
+    shows the app as needing apply.
+    """
+    save_last_applied_hashes(app_config_dir, {**hashes, STATE_KEY_INSTALLATION_STATUS: STATUS_INSTALLED}, config_mtime)
+    _remove_legacy_status_file(app_config_dir)
+    remove_needs_apply_flag(app_config_dir)
+
 def get_installation_status(app_config_dir: Path) -> str:
     """
-    Checks the installation status file for an app.
-    Defaults to NOT_INSTALLED if the file or directory doesn't exist.
+    Checks the installation status recorded in the state file for an app,
+    falling back to the legacy .installation_status file.
+    Defaults to NOT_INSTALLED if neither the file nor the directory exists.
     """
+    status = get_last_applied_hashes(app_config_dir).get(STATE_KEY_INSTALLATION_STATUS)
+    if status in (STATUS_INSTALLED, STATUS_NOT_INSTALLED):
+        return status
+
     status_file = app_config_dir / STATUS_FILE_NAME
     if not status_file.is_file():
         # If the config dir doesn't even exist, it's definitely not installed
@@ -143,23 +192,35 @@ def get_installation_status(app_config_dir: Path) -> str:
 
 def set_installation_status(app_config_dir: Path, status: str):
     """
-    Writes the installation status (INSTALLED or NOT_INSTALLED) to the file.
+    Writes the installation status (INSTALLED or NOT_INSTALLED) to the state file.
     """
     if status not in (STATUS_INSTALLED, STATUS_NOT_INSTALLED):
         raise ValueError(f"Invalid status '{status}'. Must be INSTALLED or NOT_INSTALLED.")
         
-    status_file = app_config_dir / STATUS_FILE_NAME
+    state_file = app_config_dir / STATE_FILE_NAME
     try:
         # Ensure the parent directory exists
         app_config_dir.mkdir(parents=True, exist_ok=True)
-        status_file.write_text(status)
-        log_debug(f"-> Set installation status to '{status}' in {status_file}")
+        state = get_last_applied_hashes(app_config_dir)
+        state[STATE_KEY_INSTALLATION_STATUS] = status
+        write_file_atomic(state_file, json.dumps(state, indent=2))
+        _remove_legacy_status_file(app_config_dir)
+        log_debug(f"-> Set installation status to '{status}' in {state_file}")
     except Exception as e:
-        log_error(f"Failed to write installation status to {status_file}: {e}", exit_program=True)
+        log_error(f"Failed to write installation status to {state_file}: {e}", exit_program=True)
 
 def remove_installation_status_file(app_config_dir: Path):
     """
-    Removes the .installation_status file. Used during --purge.
+    Removes the installation status from the state file. Used during --purge.
+    """
+    state = get_last_applied_hashes(app_config_dir)
+    if state.pop(STATE_KEY_INSTALLATION_STATUS, None) is not None:
+        save_last_applied_hashes(app_config_dir, state)
+    _remove_legacy_status_file(app_config_dir)
+
+def _remove_legacy_status_file(app_config_dir: Path):
+    """
+    Removes the legacy .installation_status file, if present.
     """
     status_file = app_config_dir / STATUS_FILE_NAME
     if status_file.is_file():
@@ -168,6 +229,22 @@ def remove_installation_status_file(app_config_dir: Path):
         except Exception as e:
             log_warning(f"Could not remove status file {status_file}: {e}")
 
+def calculate_build_hash(containerfile: str, context_dir: Path, base_image_id: Optional[str]) -> str:
+    """
+    Returns a SHA256 over everything an image build consumes: the base image
+    (by ID, so a newer pull changes the hash), the Containerfile text and the
+    content of every file it COPYs from the build context.
+    """
+    digest = hashlib.sha256(f"{base_image_id}\0".encode('utf-8'))
+    digest.update(containerfile.encode('utf-8'))
+    sources = sorted({line.split()[1] for line in containerfile.splitlines() if line.startswith("COPY ")})
+    for source in sources:
+        digest.update(f"\0{source}\0".encode('utf-8'))
+        with open(context_dir / source, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
 def save_image_digest(app_config_dir: Path, digest: str):
     """
     Saves digest of pushed image to state file.
@@ -198,14 +275,16 @@ def remove_image_digest(app_config_dir: Path):
 
 def clear_config_hashes_keep_digest(app_config_dir: Path):
     """
-    Removes configuration hashes from the state file but keeps the registry digest.
+    Removes configuration hashes from the state file but keeps the registry digest,
+    marking the app as NOT_INSTALLED in the same write.
     Used when uninstalling an app without purging (so we can still remove the image later).
     """
     hashes = get_last_applied_hashes(app_config_dir)
     digest = hashes.get(STATE_KEY_REGISTRY_DIGEST)
     
-    new_state = {}
+    new_state = {STATE_KEY_INSTALLATION_STATUS: STATUS_NOT_INSTALLED}
     if digest:
         new_state[STATE_KEY_REGISTRY_DIGEST] = digest
         
-    save_last_applied_hashes(app_config_dir, new_state)
\ No newline at end of file
+    save_last_applied_hashes(app_config_dir, new_state)
+    _remove_legacy_status_file(app_config_dir)
\ No newline at end of file
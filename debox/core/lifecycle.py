@@ -1,7 +1,6 @@
 # debox/core/lifecycle.py
 
 import subprocess
-import time
 from debox.core import podman_utils
 from debox.core.log_utils import log_debug, log_info, log_error, run_step
 
@@ -27,14 +26,15 @@ def run_post_install_hooks(container_name: str, config: dict):
         log_debug(f"-> Container {container_name} is stopped. Starting temporarily for hooks...")
         try:
             podman_utils.run_command(["podman", "start", container_name], check=True)
-            # Give it a moment to be ready (optional, but safer)
-            time.sleep(1)
+            # Returns as soon as the container is up (no fixed delay)
+            if not podman_utils.wait_until_running(container_name):
+                log_debug(f"-> Container {container_name} did not report 'running'. Trying the hooks anyway.")
         except Exception as e:
             log_error(f"Failed to start container for lifecycle hooks: {e}", exit_program=True)
 
     # 2. Prepare command
     command = [
-        "podman", "exec", 
+        *podman_utils.exec_command_prefix(),
         "-e", "DEBIAN_FRONTEND=noninteractive",
         container_name, 
         "/bin/bash", "-c", post_install_script
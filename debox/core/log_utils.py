@@ -22,6 +22,9 @@ class LogLevels:
 
 CURRENT_LOG_LEVEL = LogLevels.INFO
 
+# Spinner of the active ProgressReporter, reused by run_step (None if not active).
+_shared_status = None
+
 def set_log_level(level: int):
     """Sets the global log level for the application."""
     global CURRENT_LOG_LEVEL
@@ -63,16 +66,49 @@ def log_error(message: str, exit_program: bool = False):
     if exit_program:
         sys.exit(1)
 
+class ProgressReporter:
+    """
+    Context manager holding one spinner for a sequence of steps.
+    While it is active, run_step only updates the spinner's message instead of
+    starting (and tearing down) its own live display and render thread.
+    Does nothing unless the log level is INFO and the console is a terminal,
+    or if a reporter is already active.
+    """
+    def __init__(self):
+        self._status = None
+
+    def __enter__(self):
+        global _shared_status
+        if CURRENT_LOG_LEVEL == LogLevels.INFO and console.is_terminal and _shared_status is None:
+            self._status = console.status("")
+            self._status.start()
+            _shared_status = self._status
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _shared_status
+        if self._status is not None:
+            self._status.stop()
+            _shared_status = None
+            self._status = None
+        return False
+
 @contextlib.contextmanager
 def run_step(spinner_message: str, success_message: str, error_message: str, fatal: bool = True):
     """
     Context manager for long-running steps.
-    - Shows spinner if log level is INFO.
+    - Shows spinner if log level is INFO (reusing the ProgressReporter's, if active).
+    - Skips the spinner when output is not a terminal (pipes, CI logs).
     - Is silent if log level is DEBUG (verbose) or WARNING/ERROR.
     - Prints success/error.
     """
     try:
-        if CURRENT_LOG_LEVEL == LogLevels.INFO:
+        if CURRENT_LOG_LEVEL == LogLevels.INFO and _shared_status is not None:
+            _shared_status.update(f"[bold green]{spinner_message}")
+            yield _shared_status
+        elif CURRENT_LOG_LEVEL == LogLevels.INFO and not console.is_terminal:
+            yield None
+        elif CURRENT_LOG_LEVEL == LogLevels.INFO:
             with console.status(f"[bold green]{spinner_message}") as status:
                 yield status
         else:
@@ -1,7 +1,9 @@
 # debox/core/podman_utils.py
 
+import functools
 import subprocess
 import json
+import tarfile
 from typing import Optional, Dict
 from pathlib import Path
 
@@ -38,16 +40,37 @@ def run_command(command: list[str], input_str: str = None, capture_output: bool
         return process.stdout.strip()
     return None
 
-def build_image(containerfile_content: str, tag: str, context_dir: Path, 
+@functools.lru_cache(maxsize=None)
+def exec_command_prefix() -> tuple[str, ...]:
+    """
+    Returns the argv prefix for 'podman exec'. Adds --no-session when the
+    installed podman offers it, so the exec skips its session bookkeeping
+    (database writes under the container lock). Probed once per process.
+    """
+    try:
+        process = subprocess.run(["podman", "exec", "--help"], capture_output=True, text=True, check=False)
+        if "--no-session" in process.stdout:
+            return ("podman", "exec", "--no-session")
+    except OSError:
+        pass
+    return ("podman", "exec")
+
+def build_image(containerfile_path: Path, tag: str, context_dir: Path, 
                 build_args: Optional[Dict[str, str]] = None, 
-                labels: Optional[Dict[str, str]] = None):
+                labels: Optional[Dict[str, str]] = None,
+                no_cache: bool = False):
     """
-    Builds a container image.
+    Builds a container image from a Containerfile on disk.
+    Intermediate layers are cached (--layers), so unchanged steps are reused
+    by later builds; no_cache ignores that cache (the new layers are stored).
     - In VERBOSE (DEBUG) mode, streams all output to console.
     - In SILENT (INFO) mode, logs output to a file, and prints the log ONLY if an error occurs.
     """
-    command = ["podman", "build", "--pull", "-f", "-", "-t", tag]
+    command = ["podman", "build", "--pull", "--layers", "-f", str(containerfile_path), "-t", tag]
     
+    if no_cache:
+        command.append("--no-cache")
+
     if build_args:
         for key, value in build_args.items():
             command.extend(["--build-arg", f"{key}={value}"])
@@ -62,7 +85,6 @@ def build_image(containerfile_content: str, tag: str, context_dir: Path,
         log_debug(f"--> Running build command (verbose): {' '.join(command)}")
         subprocess.run(
             command,
-            input=containerfile_content,
             text=True, 
             check=True, 
             stdout=None,
@@ -75,7 +97,6 @@ def build_image(containerfile_content: str, tag: str, context_dir: Path,
             with open(log_file_path, 'w') as log_file:
                 process = subprocess.run(
                     command,
-                    input=containerfile_content,
                     text=True,
                     stdout=log_file,
                     stderr=subprocess.STDOUT,
@@ -106,6 +127,116 @@ def create_container(name: str, image_tag: str, flags: list[str]):
     command = ["podman", "create", "--name", name] + flags + [image_tag]
     run_command(command)
 
+def wait_until_running(container_name: str, timeout: float = 5.0) -> bool:
+    """
+    Blocks until the container is running, using 'podman wait
+    --condition=running', so callers return as soon as it is up instead of
+    sleeping a fixed time. Returns False if that did not happen within
+    timeout seconds (or podman could not tell).
+    """
+    command = ["podman", "wait", "--condition=running", container_name]
+    log_debug(f"--> Running command: {' '.join(command)}")
+    try:
+        subprocess.run(command, capture_output=True, text=True, check=True, timeout=timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        log_debug(f"-> Container '{container_name}' not running after {timeout} s.")
+    except (subprocess.CalledProcessError, OSError) as e:
+        log_debug(f"-> Could not wait for container '{container_name}': {e}")
+    return False
+
+_TAR_STREAM_BUFSIZE = 1 << 20
+
+def read_files_from_image(image_tag: str, list_script: str) -> Dict[str, bytes]:
+    """
+    Reads files out of an image in a single throwaway container.
+    list_script is a shell snippet, run from / inside the image, that prints
+    the relative paths of the wanted files separated by NUL bytes (e.g.
+    'find usr/share -name x -print0'). Every listed file is archived
+    (following symlinks and hard links) with tar to stdout and the stream
+    is unpacked in memory. No long-lived container has to be started,
+    exec'd into or stopped.
+
+    Returns:
+        A dict mapping absolute in-image paths to file contents.
+
+    Raises:
+        RuntimeError: If the container could not be run at all.
+    """
+    command = [
+        "podman", "run", "--rm", "--pull=never", "--network=none",
+        "--entrypoint", "sh", image_tag, "-c", _tar_files_script(list_script)
+    ]
+    return _read_tar_stream(command, f"image '{image_tag}'")
+
+def read_files_from_container(container_name: str, list_script: str) -> Dict[str, bytes]:
+    """
+    Like read_files_from_image, but reads the files from a running
+    container (podman exec), so files created at runtime (e.g. by
+    post-install hooks) are included.
+
+    Raises:
+        RuntimeError: If the command could not be run in the container at all.
+    """
+    command = ["podman", "exec", container_name, "sh", "-c", _tar_files_script(list_script)]
+    return _read_tar_stream(command, f"container '{container_name}'")
+
+def _tar_files_script(list_script: str) -> str:
+    """Wraps a list_script into a shell command that archives the listed files to stdout."""
+    return f"cd / && {{ {list_script.strip()}; }} 2>/dev/null | tar -chf - --hard-dereference --null -T - 2>/dev/null"
+
+def _read_tar_stream(command: list[str], source: str) -> Dict[str, bytes]:
+    """Runs a command that writes a tar archive to stdout and unpacks it in memory."""
+    log_debug(f"--> Running command: {' '.join(command)}")
+
+    files = {}
+    # tarfile reads the stream in 10 KiB records; a 1 MiB pipe buffer batches those reads.
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=_TAR_STREAM_BUFSIZE)
+    try:
+        with tarfile.open(fileobj=process.stdout, mode="r|") as archive:
+            for member in archive:
+                if member.isfile():
+                    files["/" + member.name] = archive.extractfile(member).read()
+    except tarfile.ReadError:
+        pass # No (or truncated) archive; the exit status below tells which
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode(errors="replace").strip()
+        process.wait()
+
+    if process.returncode != 0 and not files:
+        raise RuntimeError(f"Reading files from {source} failed: {stderr or f'exit code {process.returncode}'}")
+    return files
+
+def get_image_label(image_tag: str, label: str) -> Optional[str]:
+    """
+    Returns the value of a label on a local image, or None if the image
+    does not exist or has no such label. (Silent by default)
+    """
+    command = ["podman", "image", "inspect", image_tag, "--format", f'{{{{index .Config.Labels "{label}"}}}}']
+    log_debug(f"--> Running command: {' '.join(command)}")
+    process = subprocess.run(command, capture_output=True, text=True, check=False)
+    value = process.stdout.strip()
+    if process.returncode != 0 or value in ("", "<no value>"):
+        return None
+    return value
+
+def pull_image_id(image: str) -> Optional[str]:
+    """
+    Pulls an image (as 'podman build --pull' would) and returns its image ID.
+    Falls back to the local copy's ID if the pull fails (e.g. offline, or a
+    'localhost/' image that only exists locally). Returns None if neither
+    is available. (Silent by default)
+    """
+    for command in (["podman", "pull", "--quiet", image],
+                    ["podman", "image", "inspect", image, "--format", "{{.Id}}"]):
+        log_debug(f"--> Running command: {' '.join(command)}")
+        process = subprocess.run(command, capture_output=True, text=True, check=False)
+        lines = process.stdout.strip().splitlines()
+        if process.returncode == 0 and lines:
+            return lines[-1]
+    return None
+
 def local_image_exists(image_tag: str) -> bool:
     """Checks, if the image exists in local Podman cache."""
     log_debug(f"Checking for local image: {image_tag}")
@@ -168,4 +299,48 @@ def get_container_status(container_name: str) -> str:
         return "Error (JSON)"
     except Exception as e:
         log_warning(f"An unexpected error occurred checking status for {container_name}: {e}")
-        return "Error (Check)"
\ No newline at end of file
+        return "Error (Check)"
+
+def get_all_container_statuses(container_names: list[str]) -> Dict[str, str]:
+    """
+    Returns {container_name: status} for many containers at once, using one
+    'podman ps' call (plus one 'podman images' call if some are missing)
+    instead of get_container_status per container. Statuses match the ones
+    returned by get_container_status.
+    """
+    if not container_names:
+        return {}
+
+    ps_command = ["podman", "ps", "-a", "--format", "json"]
+    try:
+        log_debug(f"--> Running command: {' '.join(ps_command)}")
+        process = subprocess.run(ps_command, capture_output=True, text=True, check=False)
+        if process.returncode != 0:
+            log_debug(f"Warning: 'podman ps' command failed: {process.stderr.strip()}")
+            return dict.fromkeys(container_names, "Error")
+
+        states = {}
+        for info in json.loads(process.stdout or "[]") or []:
+            for name in info.get('Names') or []:
+                states[name] = info.get('State', 'Unknown')
+
+        missing = [name for name in container_names if name not in states]
+        if missing:
+            local_images = set()
+            output = run_command(["podman", "images", "--format", "json"], capture_output=True, check=False)
+            for image in json.loads(output or "[]") or []:
+                local_images.update(image.get('Names') or [])
+            for name in missing:
+                if f"localhost/{name}:latest" in local_images:
+                    states[name] = "Not Found (Image Exists)"
+                else:
+                    states[name] = "Not Found (No Image)"
+
+        return {name: states[name] for name in container_names}
+
+    except json.JSONDecodeError:
+        log_warning("Could not parse JSON output from podman")
+        return dict.fromkeys(container_names, "Error (JSON)")
+    except Exception as e:
+        log_warning(f"An unexpected error occurred checking container statuses: {e}")
+        return dict.fromkeys(container_names, "Error (Check)")
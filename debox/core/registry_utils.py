@@ -1,6 +1,10 @@
 # debox/core/registry_utils.py
 """
 Utility functions for interacting with the local debox registry.
+
+'requests' is imported inside the functions that talk to the registry API:
+it is the most expensive import in debox, and 'debox run' reaches this module
+through container_ops without ever needing HTTP.
 """
 
 import os
@@ -8,7 +12,6 @@ from pathlib import Path
 import subprocess
 import tempfile
 import time
-import requests
 from typing import List, Optional
 from . import podman_utils
 from . import global_config
@@ -20,6 +23,8 @@ def ensure_registry_running():
     Starts it if 'created' or 'exited'.
     Performs a health check to ensure it's responsive.
     """
+    import requests
+
     registry_name = global_config.get_registry_name()
     log_debug(f"Ensuring registry container '{registry_name}' is running...")
     
@@ -37,14 +42,12 @@ def ensure_registry_running():
         except Exception as e:
             log_error(f"Failed to auto-initialize registry: {e}", exit_program=True)
     
-    needs_start = False
     if "running" in status.lower():
         log_debug("-> Registry is already running.")
     elif "exited" in status.lower() or "created" in status.lower():
         log_info("-> Registry is not running. Starting...")
         try:
             podman_utils.run_command(["podman", "start", registry_name])
-            needs_start = True
         except Exception as e:
             log_error(f"Failed to start registry: {e}", exit_program=True)
     else:
@@ -54,22 +57,22 @@ def ensure_registry_running():
     registry_address = global_config.get_registry_address()
     api_url = f"http://{registry_address}/v2/"
     
-    if needs_start:
-        time.sleep(1)
-
-    for i in range(10):
+    # Poll at short intervals (about 5 s in total) instead of waiting a fixed
+    # second after a start; an already running registry answers the first try.
+    attempts = 50
+    for i in range(attempts):
         try:
             response = requests.get(api_url, timeout=1)
             if response.status_code == 200 or response.status_code == 401:
                 log_debug("-> Registry is responsive.")
                 return True # Sukces
         except requests.ConnectionError:
-            log_debug(f"   ... registry not ready yet (attempt {i+1}/10)")
+            log_debug(f"   ... registry not ready yet (attempt {i+1}/{attempts})")
             pass
         except Exception as e:
             log_warning(f"Registry health check error: {e}")
             
-        time.sleep(0.5)
+        time.sleep(0.1)
         
     log_error(f"Registry container '{registry_name}' is running but did not respond at {api_url}.", exit_program=True)
     return False
@@ -127,6 +130,8 @@ def get_registry_catalog() -> List[str]:
     """
     Queries the registry's /v2/_catalog endpoint to get all repository names.
     """
+    import requests
+
     if not ensure_registry_running():
         raise Exception("Registry could not be started.")
         
@@ -147,6 +152,8 @@ def get_image_tags(image_name: str) -> List[str]:
     """
     Queries the registry's /v2/<name>/tags/list endpoint for a specific image.
     """
+    import requests
+
     registry_address = global_config.get_registry_address()
     api_url = f"http://{registry_address}/v2/{image_name}/tags/list"
 
@@ -171,6 +178,8 @@ def get_image_manifest_digest(image_name: str, tag: str) -> Optional[str]:
     Fetches the 'Docker-Content-Digest' for a specific image tag.
     This digest is the unique ID required for deletion.
     """
+    import requests
+
     if not ensure_registry_running():
         raise Exception("Registry could not be started.")
         
@@ -207,11 +216,15 @@ def get_image_manifest_digest(image_name: str, tag: str) -> Optional[str]:
         return None
 
 
-def delete_image_manifest(image_name: str, digest: str) -> bool:
+def delete_image_manifest(image_name: str, digest: str, ensure_running: bool = True) -> bool:
     """
     Deletes an image manifest from the registry using its digest.
+    Callers deleting many manifests concurrently pass ensure_running=False
+    after calling ensure_registry_running() once themselves.
     """
-    if not ensure_registry_running():
+    import requests
+
+    if ensure_running and not ensure_registry_running():
         raise Exception("Registry could not be started.")
         
     registry_address = global_config.get_registry_address()
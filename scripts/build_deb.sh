@@ -98,6 +98,10 @@ auto_bump_version() {
     sed -i "s/debox_[0-9]\+\.[0-9]\+\.[0-9]\+\(-[0-9]\+\)\?_all\.deb/debox_${NEW_FULL_VER}_all.deb/g" README.md
     git add README.md
 
+    echo "   Updating debox/_version.py to version $NEW_UPSTREAM..."
+    sed -i "s/^__version__ = .*/__version__ = \"${NEW_UPSTREAM}\"/" "$SOURCE_DIR/_version.py"
+    git add "$SOURCE_DIR/_version.py"
+
     # Commit the changelog bump
     # Note: We are modifying the repo here, so it becomes dirty for a split second until we commit.
     git add debian/changelog
@@ -169,13 +173,30 @@ echo "-> Copying source code to /usr/lib/$APP_NAME..."
 cp -r "$SOURCE_DIR" "$BUILD_DIR/usr/lib/$APP_NAME/"
 find "$BUILD_DIR/usr/lib/$APP_NAME" -name "__pycache__" -type d -exec rm -rf {} +
 
+# 3b. Maintainer scripts: byte-compile on install, drop the caches on removal.
+# /usr/lib is not writable for users, so without this every run compiles from source.
+echo "-> Creating maintainer scripts (bytecode compilation)..."
+cat <<EOF > "$BUILD_DIR/DEBIAN/postinst"
+#!/bin/sh
+set -e
+if [ "\$1" = "configure" ]; then
+    python3 -m compileall -q "/usr/lib/$APP_NAME" >/dev/null || true
+fi
+EOF
+cat <<EOF > "$BUILD_DIR/DEBIAN/prerm"
+#!/bin/sh
+set -e
+find "/usr/lib/$APP_NAME" -name "__pycache__" -type d -exec rm -rf {} + 2>/dev/null || true
+EOF
+chmod 755 "$BUILD_DIR/DEBIAN/postinst" "$BUILD_DIR/DEBIAN/prerm"
+
 # 4. Create entry point script
 echo "-> Creating entry point script /usr/bin/$APP_NAME..."
 cat <<EOF > "$BUILD_DIR/usr/bin/$APP_NAME"
 #!/bin/sh
 # Wrapper script for debox
 export PYTHONPATH="/usr/lib/$APP_NAME"
-exec python3 -m debox.cli "\$@"
+exec python3 -m debox "\$@"
 EOF
 chmod 755 "$BUILD_DIR/usr/bin/$APP_NAME"
 
@@ -0,0 +1,45 @@
+#!/bin/bash
+# test_examples_containerfile.sh
+# Generates a Containerfile from every config in examples/ (no podman needed).
+
+REPO_DIR="$(cd "$(dirname "$0")/.." && pwd)"
+
+# Colors
+GREEN="\033[0;32m"
+RED="\033[0;31m"
+YELLOW="\033[0;33m"
+NC="\033[0m"
+
+echo -e "\n${YELLOW}--- Generating Containerfiles for examples/*.yml ---${NC}"
+
+FAILED=0
+for CONFIG in "$REPO_DIR"/examples/*.yml; do
+    if PYTHONPATH="$REPO_DIR" python3 - "$CONFIG" > /dev/null <<'EOF'
+import sys
+from pathlib import Path
+import yaml
+from debox.core import config_utils
+from debox.core.container_ops import _generate_containerfile
+
+config_path = Path(sys.argv[1])
+with open(config_path) as f:
+    is_base_image = 'image_name' in (yaml.safe_load(f) or {})
+if is_base_image:
+    # Loaded the way 'debox image build' does it
+    config = config_utils.load_config(config_path, required_keys=('image_name',))
+    config['container_name'] = config['image_name']
+else:
+    config = config_utils.load_config(config_path)
+
+containerfile = _generate_containerfile(config, "debox-test", 1000, "en_US.UTF-8")
+assert containerfile.startswith("FROM "), "Containerfile does not start with FROM"
+EOF
+    then
+        echo -e "${GREEN}✅ PASS: $(basename "$CONFIG")${NC}"
+    else
+        echo -e "${RED}❌ FAIL: $(basename "$CONFIG")${NC}"
+        FAILED=1
+    fi
+done
+
+exit $FAILED